@@ -0,0 +1,54 @@
+"""
+벤치마크 공용 함수: 워크로드 파일 로드, 로컬 대상 확인, 벤치 사용자 이름 규칙.
+"""
+import json
+import os
+import subprocess
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORKLOAD = os.path.join(BENCH_DIR, 'workload.json')
+
+# 벤치마크는 로컬 Postgres/Redis/서비스에만 실행한다
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1'}
+
+# 시드 데이터 식별 접두사 (다시 시드할 때 이 접두사의 데이터만 지운다)
+BENCH_PREFIX = 'bench-'
+BENCH_EMAIL_DOMAIN = 'bench.local'
+
+
+def load_workload(path=None):
+    with open(path or DEFAULT_WORKLOAD, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ensure_local(host, what):
+    if host not in LOCAL_HOSTS:
+        raise SystemExit(f'{what} must point to a local host ({", ".join(sorted(LOCAL_HOSTS))}), got {host!r}')
+
+
+def ensure_local_workload(workload):
+    """
+    워크로드가 가리키는 DB, Redis, 서비스 URL이 모두 로컬인지 확인한다.
+    """
+    ensure_local(workload['database']['host'], 'database.host')
+    ensure_local(workload['redis']['host'], 'redis.host')
+    for name, url in workload['services'].items():
+        ensure_local(urlparse(url).hostname, f'services.{name}')
+
+
+def bench_email(index):
+    return f'{BENCH_PREFIX}{index:06d}@{BENCH_EMAIL_DOMAIN}'
+
+
+def bench_username(index):
+    return f'{BENCH_PREFIX}{index:06d}'
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,81 @@
+"""
+두 벤치마크 결과(JSON)를 비교한다.
+
+엔드포인트별 p50/p95/p99와 RPS의 변화율을 출력하고, p95가 threshold보다 많이 늘었거나
+RPS가 threshold보다 많이 줄어든 엔드포인트가 있으면 종료 코드 1을 반환한다.
+
+사용법: python bench/compare.py bench/results/<base>.json bench/results/<new>.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'rps')
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def change(base, new):
+    if base is None or new is None or base == 0:
+        return None
+    return (new - base) / base
+
+
+def format_cell(base, new):
+    if base is None and new is None:
+        return '-'
+    delta = change(base, new)
+    delta_text = '' if delta is None else f' ({delta:+.1%})'
+    return f'{base if base is not None else "-"} -> {new if new is not None else "-"}{delta_text}'
+
+
+def regressions(name, base, new, threshold):
+    found = []
+    p95 = change(base.get('p95_ms'), new.get('p95_ms'))
+    if p95 is not None and p95 > threshold:
+        found.append(f'{name}: p95 {base["p95_ms"]}ms -> {new["p95_ms"]}ms ({p95:+.1%})')
+    rps = change(base.get('rps'), new.get('rps'))
+    if rps is not None and rps < -threshold:
+        found.append(f'{name}: rps {base["rps"]} -> {new["rps"]} ({rps:+.1%})')
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark results.')
+    parser.add_argument('base', help='baseline result JSON')
+    parser.add_argument('new', help='new result JSON')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed relative p95 increase / rps decrease (default: 0.10)')
+    args = parser.parse_args()
+
+    base = load(args.base)
+    new = load(args.new)
+    print(f'base: {base["meta"].get("commit")} ({base["meta"].get("created_at")})')
+    print(f'new:  {new["meta"].get("commit")} ({new["meta"].get("created_at")})')
+    if base['meta'].get('workload') != new['meta'].get('workload'):
+        print('warning: workloads differ; results may not be comparable')
+
+    rows = [('TOTAL', base['total'], new['total'])]
+    for name in sorted(set(base['endpoints']) | set(new['endpoints'])):
+        rows.append((name, base['endpoints'].get(name, {}), new['endpoints'].get(name, {})))
+
+    print(f'{"endpoint":<22}' + ''.join(f'{metric:>30}' for metric in METRICS))
+    found = []
+    for name, base_row, new_row in rows:
+        cells = [format_cell(base_row.get(metric), new_row.get(metric)) for metric in METRICS]
+        print(f'{name:<22}' + ''.join(f'{cell:>30}' for cell in cells))
+        found.extend(regressions(name, base_row, new_row, args.threshold))
+
+    if found:
+        print(f'\nRegressions over {args.threshold:.0%}:')
+        for line in found:
+            print(f'  {line}')
+        sys.exit(1)
+    print(f'\nNo regressions over {args.threshold:.0%}.')
+
+
+if __name__ == '__main__':
+    main()
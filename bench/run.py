@@ -0,0 +1,274 @@
+"""
+혼합 워크로드 부하 실행기.
+
+workload.json의 mix 비율대로 로그인, /users/me, /sub/plans, /sub/plans/user, /recommend, /sub/payments 깊은 페이지
+(페이지 번호 모드와 커서 모드)를 concurrency개의 스레드가 동시에 호출한다. warmup_seconds 동안의 요청은
+집계에서 빼고, 이후 duration_seconds 동안 엔드포인트별 p50/p95/p99 지연 시간(ms)과 RPS를 JSON 기준선으로 저장한다.
+비교는 compare.py로 한다.
+
+사용법: python bench/run.py [--workload bench/workload.json] [--output bench/results/<commit>.json]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from common import BENCH_DIR, bench_email, ensure_local_workload, git_commit, load_workload
+
+
+def percentile(sorted_values, fraction):
+    """
+    nearest-rank 백분위수.
+    """
+    if not sorted_values:
+        return None
+    # 순위는 ceil(p * n)이다. round()는 짝수 쪽으로 반올림하므로 쓰지 않고,
+    # 0.07 * 100 = 7.000000000000001 같은 부동소수점 오차로 한 순위 밀리지 않도록 곱을 먼저 자른다
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    index = max(0, min(len(sorted_values) - 1, rank - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """
+    스레드 안전한 엔드포인트별 지연 시간/상태 코드 기록. 측정 시작 전(워밍업)의 요청은 버린다.
+    """
+
+    def __init__(self):
+        self.measure_from = None
+        self._latencies = {}
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, started, elapsed, status):
+        if self.measure_from is None or started < self.measure_from:
+            return
+        with self._lock:
+            self._latencies.setdefault(endpoint, []).append(elapsed)
+            statuses = self._statuses.setdefault(endpoint, {})
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def summary(self, measured_seconds):
+        endpoints = {}
+        all_latencies = []
+        total_errors = 0
+        for endpoint in sorted(self._latencies):
+            latencies = sorted(self._latencies[endpoint])
+            all_latencies.extend(latencies)
+            statuses = self._statuses[endpoint]
+            errors = sum(count for status, count in statuses.items() if not str(status).startswith('2'))
+            total_errors += errors
+            endpoints[endpoint] = stats(latencies, errors, measured_seconds)
+            endpoints[endpoint]['statuses'] = {str(status): count for status, count in sorted(statuses.items(), key=str)}
+        all_latencies.sort()
+        return endpoints, stats(all_latencies, total_errors, measured_seconds)
+
+
+def stats(latencies, errors, measured_seconds):
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / measured_seconds, 2),
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'max_ms': ms(latencies[-1]) if latencies else None,
+    }
+
+
+class Workload:
+
+    def __init__(self, workload, recorder):
+        self.services = workload['services']
+        self.dataset = workload['dataset']
+        self.run = workload['run']
+        self.recorder = recorder
+        self.timeout = self.run['request_timeout_seconds']
+        self.tokens = {}
+        self.heavy_indexes = list(range(min(self.dataset['heavy_users'], self.dataset['users'])))
+        mix = {name: weight for name, weight in workload['mix'].items() if weight > 0}
+        unknown = set(mix) - set(self.operations())
+        if unknown:
+            raise SystemExit(f'Unknown operations in mix: {", ".join(sorted(unknown))}')
+        self.mix_names = list(mix)
+        self.mix_weights = list(mix.values())
+
+    def operations(self):
+        return {
+            'login': self.login,
+            'users_me': self.users_me,
+            'sub_plans': self.sub_plans,
+            'sub_plans_user': self.sub_plans_user,
+            'recommend': self.recommend,
+            'payments_offset_deep': self.payments_offset_deep,
+            'payments_cursor_deep': self.payments_cursor_deep,
+        }
+
+    def call(self, session, endpoint, method, url, **kwargs):
+        started = time.monotonic()
+        try:
+            response = session.request(method, url, timeout=self.timeout, **kwargs)
+            status = response.status_code
+        except requests.RequestException as e:
+            response = None
+            status = type(e).__name__
+        self.recorder.record(endpoint, started, time.monotonic() - started, status)
+        return response
+
+    def _login(self, session, index, endpoint='login'):
+        response = self.call(
+            session, endpoint, 'POST', f'{self.services["user"]}/users/login',
+            json={'email': bench_email(index), 'password': self.dataset['password']},
+        )
+        if response is not None and response.status_code == 200:
+            return response.json().get('access_token')
+        return None
+
+    def prepare_tokens(self):
+        """
+        측정 전에 token_users명(heavy 사용자 포함)의 토큰을 미리 받아 둔다.
+        """
+        count = min(self.run['token_users'], self.dataset['users'])
+        indexes = sorted(set(range(count)) | set(self.heavy_indexes))
+        session = requests.Session()
+        for index in indexes:
+            token = self._login(session, index, endpoint='setup_login')
+            if token is None:
+                raise SystemExit(f'Login failed for {bench_email(index)}; run bench/seed.py first')
+            self.tokens[index] = token
+        self.token_indexes = indexes
+
+    def headers(self, index):
+        return {'Authorization': f'Bearer {self.tokens[index]}'}
+
+    def login(self, session, rng):
+        self._login(session, rng.randrange(self.dataset['users']))
+
+    def users_me(self, session, rng):
+        index = rng.choice(self.token_indexes)
+        self.call(session, 'users_me', 'GET', f'{self.services["user"]}/users/me', headers=self.headers(index))
+
+    def sub_plans(self, session, rng):
+        index = rng.choice(self.token_indexes)
+        self.call(session, 'sub_plans', 'GET', f'{self.services["subs"]}/sub/plans', headers=self.headers(index))
+
+    def sub_plans_user(self, session, rng):
+        index = rng.choice(self.token_indexes)
+        self.call(session, 'sub_plans_user', 'GET', f'{self.services["subs"]}/sub/plans/user',
+                  headers=self.headers(index))
+
+    def recommend(self, session, rng):
+        index = rng.choice(self.token_indexes)
+        force = rng.random() < self.run['recommend_force_ratio']
+        self.call(session, 'recommend_force' if force else 'recommend', 'POST',
+                  f'{self.services["reco"]}/recommend', params={'force': 'true'} if force else None,
+                  headers=self.headers(index))
+
+    def payments_offset_deep(self, session, rng):
+        index = rng.choice(self.heavy_indexes)
+        low, high = self.run['payments_offset_pages']
+        self.call(session, 'payments_offset_deep', 'GET', f'{self.services["subs"]}/sub/payments',
+                  params={'page': rng.randint(low, high), 'per_page': self.run['payments_per_page']},
+                  headers=self.headers(index))
+
+    def payments_cursor_deep(self, session, rng):
+        """
+        커서를 따라 payments_cursor_pages쪽까지 넘긴다. 각 페이지 요청을 한 건으로 기록한다.
+        """
+        index = rng.choice(self.heavy_indexes)
+        params = {'pagination': 'cursor', 'per_page': self.run['payments_per_page']}
+        for _ in range(self.run['payments_cursor_pages']):
+            response = self.call(session, 'payments_cursor_deep', 'GET', f'{self.services["subs"]}/sub/payments',
+                                 params=params, headers=self.headers(index))
+            if response is None or response.status_code != 200:
+                return
+            next_cursor = response.json().get('next_cursor')
+            if not next_cursor:
+                return
+            params = {'cursor': next_cursor, 'per_page': self.run['payments_per_page']}
+
+    def worker(self, worker_index, deadline):
+        rng = random.Random(self.run['seed'] * 1000 + worker_index)
+        operations = self.operations()
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            name = rng.choices(self.mix_names, weights=self.mix_weights)[0]
+            operations[name](session, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the mixed benchmark workload and write a JSON baseline.')
+    parser.add_argument('--workload', help='workload JSON file (default: bench/workload.json)')
+    parser.add_argument('--output', help='result file (default: bench/results/<git commit>.json)')
+    parser.add_argument('--concurrency', type=int, help='override run.concurrency')
+    parser.add_argument('--duration', type=int, help='override run.duration_seconds')
+    args = parser.parse_args()
+
+    workload = load_workload(args.workload)
+    ensure_local_workload(workload)
+    if args.concurrency:
+        workload['run']['concurrency'] = args.concurrency
+    if args.duration:
+        workload['run']['duration_seconds'] = args.duration
+    run = workload['run']
+
+    recorder = Recorder()
+    bench = Workload(workload, recorder)
+    print(f'Logging in {run["token_users"]} bench users...')
+    bench.prepare_tokens()
+
+    started = time.monotonic()
+    recorder.measure_from = started + run['warmup_seconds']
+    deadline = recorder.measure_from + run['duration_seconds']
+    print(f'Running {run["concurrency"]} workers: {run["warmup_seconds"]}s warmup + {run["duration_seconds"]}s')
+    threads = [
+        threading.Thread(target=bench.worker, args=(i, deadline), name=f'bench-{i}', daemon=True)
+        for i in range(run['concurrency'])
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    measured_seconds = max(time.monotonic(), deadline) - recorder.measure_from
+
+    endpoints, total = recorder.summary(measured_seconds)
+    commit = git_commit()
+    result = {
+        'meta': {
+            'commit': commit,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'host': platform.node(),
+            'python': platform.python_version(),
+            'measured_seconds': round(measured_seconds, 2),
+            'workload': {key: workload[key] for key in ('dataset', 'run', 'mix')},
+        },
+        'total': total,
+        'endpoints': endpoints,
+    }
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f'{commit or "unknown"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+    print(f'{"endpoint":<22}{"count":>8}{"errors":>8}{"rps":>10}{"p50":>10}{"p95":>10}{"p99":>10}')
+    for name, row in list(endpoints.items()) + [('TOTAL', total)]:
+        print(f'{name:<22}{row["count"]:>8}{row["errors"]:>8}{row["rps"]:>10}'
+              f'{row["p50_ms"] or "-":>10}{row["p95_ms"] or "-":>10}{row["p99_ms"] or "-":>10}')
+    print(f'Saved {output}')
+
+
+if __name__ == '__main__':
+    main()
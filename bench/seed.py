@@ -0,0 +1,229 @@
+"""
+벤치마크용 합성 데이터 시드.
+
+로컬 Postgres에 벤치 사용자(user_service)와 제공업체/플랜/구독/결제 내역(subs_service)을 만든다.
+heavy_users명은 heavy_user_payments건의 결제 내역을 가지며 /sub/payments 깊은 페이지 조회에 사용한다.
+이전에 시드한 벤치 데이터(bench- 접두사)는 먼저 지우므로 같은 워크로드 파일로 다시 실행하면 같은 데이터가 만들어진다.
+ORM 세션 이벤트를 거치지 않으므로 마지막에 Redis의 카탈로그 버전을 올리고 벤치 사용자의 캐시 키를 지운다.
+
+사용법: python bench/seed.py [--workload bench/workload.json]
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import psycopg2
+from psycopg2.extras import execute_values
+from redis import Redis
+from werkzeug.security import generate_password_hash
+
+from common import (
+    BENCH_PREFIX, bench_email, bench_username, ensure_local_workload, load_workload,
+)
+
+PAYMENT_STATUSES = ('successful',) * 17 + ('failed', 'pending', 'refunded')
+PAYMENT_METHODS = ('credit_card', 'debit_card', 'bank_transfer')
+
+# sm-subs/sm-reco가 사용하는 Redis 키
+CATALOG_VERSION_KEY = 'catalog:plans:version'
+RECO_PLANS_KEY = 'SUB_PLANS'
+DEACTIVATED_USERS_KEY = 'users:deactivated'
+
+_BENCH_PROVIDERS = f"SELECT id FROM subscription_providers WHERE provider_name LIKE '{BENCH_PREFIX}%'"
+_BENCH_PLANS = f'SELECT id FROM subscription_plans WHERE provider_id IN ({_BENCH_PROVIDERS})'
+_BENCH_SUBSCRIPTIONS = f'SELECT id FROM user_subscriptions WHERE subscription_plan_id IN ({_BENCH_PLANS})'
+
+
+def connect(database, dbname):
+    return psycopg2.connect(
+        host=database['host'], port=database['port'], user=database['user'],
+        password=database['password'], dbname=dbname,
+    )
+
+
+def seed_users(conn, dataset, password_hash):
+    with conn, conn.cursor() as cur:
+        cur.execute('DELETE FROM users WHERE email LIKE %s', (f'{BENCH_PREFIX}%',))
+        rows = [
+            (bench_email(i), bench_username(i), password_hash, f'Bench User {i}', True)
+            for i in range(dataset['users'])
+        ]
+        user_ids = execute_values(
+            cur,
+            'INSERT INTO users (email, username, password_hash, full_name, is_active) VALUES %s RETURNING id',
+            rows, page_size=1000, fetch=True,
+        )
+        cur.execute('ANALYZE users')
+    return [row[0] for row in user_ids]
+
+
+def clear_bench_subscriptions(cur):
+    cur.execute(f'DELETE FROM subscription_payments WHERE user_subscription_id IN ({_BENCH_SUBSCRIPTIONS})')
+    cur.execute(f'DELETE FROM user_subscriptions WHERE subscription_plan_id IN ({_BENCH_PLANS})')
+    cur.execute(f'DELETE FROM subscription_plans WHERE provider_id IN ({_BENCH_PROVIDERS})')
+    cur.execute(f"DELETE FROM subscription_providers WHERE provider_name LIKE '{BENCH_PREFIX}%'")
+
+
+def seed_catalog(cur, dataset, rng):
+    providers = [
+        (f'{BENCH_PREFIX}provider-{i:04d}', f'{i:010d}', f'contact{i}@{BENCH_PREFIX}provider.local', 'active')
+        for i in range(dataset['providers'])
+    ]
+    provider_ids = [row[0] for row in execute_values(
+        cur,
+        'INSERT INTO subscription_providers (provider_name, business_registration_number, contact_email, status) '
+        'VALUES %s RETURNING id',
+        providers, fetch=True,
+    )]
+
+    plans = []
+    for provider_id in provider_ids:
+        for n in range(dataset['plans_per_provider']):
+            fee = Decimal(rng.randrange(3000, 30000, 100))
+            plans.append((provider_id, f'Plan {n + 1}', fee, rng.choice((1, 1, 1, 3, 12)), '{}', True))
+    plan_rows = execute_values(
+        cur,
+        'INSERT INTO subscription_plans (provider_id, plan_name, monthly_fee, billing_cycle_months, features, is_active) '
+        'VALUES %s RETURNING id, provider_id, monthly_fee',
+        plans, fetch=True,
+    )
+    plans_by_provider = {}
+    for plan_id, provider_id, fee in plan_rows:
+        plans_by_provider.setdefault(provider_id, []).append((plan_id, fee))
+    return plans_by_provider
+
+
+def seed_subscriptions(cur, dataset, rng, user_ids, plans_by_provider):
+    """
+    사용자마다 서로 다른 제공업체의 플랜을 subscriptions_per_user개 구독시킨다.
+    (구독 ID, 사용자 ID, 월 요금) 목록을 반환한다.
+    """
+    today = date.today()
+    provider_ids = list(plans_by_provider)
+    count = min(dataset['subscriptions_per_user'], len(provider_ids))
+    rows = []
+    fees = []
+    for user_id in user_ids:
+        for provider_id in rng.sample(provider_ids, count):
+            plan_id, fee = rng.choice(plans_by_provider[provider_id])
+            start = today - timedelta(days=rng.randrange(30, 1000))
+            rows.append((user_id, plan_id, start, today + timedelta(days=rng.randrange(1, 30)),
+                         True, rng.choice(PAYMENT_METHODS), 'active'))
+            fees.append(fee)
+    subscription_rows = execute_values(
+        cur,
+        'INSERT INTO user_subscriptions '
+        '(user_id, subscription_plan_id, start_date, next_billing_date, auto_renewal, payment_method, status) '
+        'VALUES %s RETURNING id, user_id',
+        rows, page_size=1000, fetch=True,
+    )
+    return [(sub_id, user_id, fee) for (sub_id, user_id), fee in zip(subscription_rows, fees)]
+
+
+def payment_rows(rng, subscription_id, fee, count, now):
+    for _ in range(count):
+        paid_at = now - timedelta(seconds=rng.randrange(0, 3 * 365 * 24 * 3600))
+        yield (subscription_id, fee, paid_at, rng.choice(PAYMENT_STATUSES), rng.choice(PAYMENT_METHODS))
+
+
+def seed_payments(cur, dataset, rng, subscriptions, heavy_user_ids):
+    """
+    모든 구독에 payments_per_subscription건, heavy 사용자에게는 heavy_user_payments건을 구독에 나눠 만든다.
+    """
+    now = datetime.now(timezone.utc)
+    subscriptions_by_user = {}
+    for subscription_id, user_id, fee in subscriptions:
+        subscriptions_by_user.setdefault(user_id, []).append((subscription_id, fee))
+
+    total = 0
+    batch = []
+
+    def flush():
+        execute_values(
+            cur,
+            'INSERT INTO subscription_payments '
+            '(user_subscription_id, amount_paid, payment_date, payment_status, payment_method) VALUES %s',
+            batch, page_size=5000,
+        )
+        batch.clear()
+
+    for user_id, user_subscriptions in subscriptions_by_user.items():
+        if user_id in heavy_user_ids:
+            per_subscription = max(1, dataset['heavy_user_payments'] // len(user_subscriptions))
+        else:
+            per_subscription = dataset['payments_per_subscription']
+        for subscription_id, fee in user_subscriptions:
+            batch.extend(payment_rows(rng, subscription_id, fee, per_subscription, now))
+            total += per_subscription
+            if len(batch) >= 50000:
+                flush()
+    if batch:
+        flush()
+    return total
+
+
+def invalidate_caches(redis_config, user_ids):
+    redis = Redis(
+        host=redis_config['host'], port=redis_config['port'], db=redis_config['db'],
+        password=redis_config['password'], decode_responses=True,
+    )
+    pipe = redis.pipeline(transaction=False)
+    # sm-subs 카탈로그 버전을 올려 모든 워커의 카탈로그 캐시를 무효화
+    pipe.incr(CATALOG_VERSION_KEY)
+    pipe.delete(RECO_PLANS_KEY)
+    for start in range(0, len(user_ids), 1000):
+        chunk = user_ids[start:start + 1000]
+        pipe.delete(*[f'user:{user_id}' for user_id in chunk])
+        pipe.delete(*[f'user:{user_id}:recommendation' for user_id in chunk])
+        pipe.srem(DEACTIVATED_USERS_KEY, *chunk)
+    pipe.execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed synthetic benchmark data into local Postgres.')
+    parser.add_argument('--workload', help='workload JSON file (default: bench/workload.json)')
+    parser.add_argument('--hash-method', default='scrypt',
+                        help='Werkzeug password hash method; match the PASSWORD_HASH_METHOD of sm-user')
+    args = parser.parse_args()
+
+    workload = load_workload(args.workload)
+    ensure_local_workload(workload)
+    dataset = workload['dataset']
+    database = workload['database']
+    rng = random.Random(dataset['seed'])
+    started = time.monotonic()
+
+    # 모든 벤치 사용자가 같은 비밀번호를 쓰므로 해시는 한 번만 계산한다
+    password_hash = generate_password_hash(dataset['password'], method=args.hash_method)
+
+    user_conn = connect(database, database['user_db'])
+    try:
+        user_ids = seed_users(user_conn, dataset, password_hash)
+    finally:
+        user_conn.close()
+    print(f'users: {len(user_ids)}')
+
+    heavy_user_ids = set(user_ids[:dataset['heavy_users']])
+    subs_conn = connect(database, database['subs_db'])
+    try:
+        with subs_conn, subs_conn.cursor() as cur:
+            clear_bench_subscriptions(cur)
+            plans_by_provider = seed_catalog(cur, dataset, rng)
+            subscriptions = seed_subscriptions(cur, dataset, rng, user_ids, plans_by_provider)
+            payments = seed_payments(cur, dataset, rng, subscriptions, heavy_user_ids)
+            # 새 데이터 기준으로 실행 계획을 세우도록 통계를 갱신
+            for table in ('subscription_providers', 'subscription_plans', 'user_subscriptions', 'subscription_payments'):
+                cur.execute(f'ANALYZE {table}')
+    finally:
+        subs_conn.close()
+    print(f'providers: {len(plans_by_provider)}, plans: {sum(len(p) for p in plans_by_provider.values())}, '
+          f'subscriptions: {len(subscriptions)}, payments: {payments}')
+
+    invalidate_caches(workload['redis'], user_ids)
+    print(f'seeded in {time.monotonic() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -48,8 +48,13 @@ CREATE TABLE user_subscriptions (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
-CREATE INDEX idx_user_subs_user_id ON user_subscriptions(user_id);
+-- (user_id, subscription_plan_id): create_subscription의 사용자+플랜 조회와 user_id 단독 조회
+CREATE INDEX idx_user_subs_user_plan ON user_subscriptions(user_id, subscription_plan_id);
 CREATE INDEX idx_user_subs_plan_id ON user_subscriptions(subscription_plan_id);
+-- 사용자·플랜당 활성 구독은 하나만 허용 (활성 구독 조회 user_id + status='active'도 이 인덱스를 사용)
+CREATE UNIQUE INDEX uq_user_subs_active_user_plan ON user_subscriptions(user_id, subscription_plan_id) WHERE status = 'active';
+-- 갱신/만료 배치 작업의 결제일 순 조회
+CREATE INDEX idx_user_subs_active_next_billing ON user_subscriptions(next_billing_date, id) WHERE status = 'active';
 
 -- 5. 구독 결제 내역 테이블 생성
 CREATE TABLE subscription_payments (
@@ -61,7 +66,8 @@ CREATE TABLE subscription_payments (
     payment_method VARCHAR(50),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
-CREATE INDEX idx_subscription_payments_user_sub_id ON subscription_payments(user_subscription_id);
+-- (user_subscription_id, payment_date DESC, id DESC): 결제 내역 커서 페이지네이션용 (user_subscription_id 단독 조회도 처리)
+CREATE INDEX idx_subscription_payments_sub_date_id ON subscription_payments(user_subscription_id, payment_date DESC, id DESC);
 
 INSERT INTO subscription_providers
 (provider_name, business_registration_number, contact_email, contact_phone, status)
@@ -1,10 +1,18 @@
-import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from .cache import TwoTierCache
+from .catalog import reset_after_fork as reset_catalog_after_fork
 from .config import Config
+from .events import register_subscription_events
+from .health import ReadinessChecker
+from .logs import init_logging
+from .metrics import init_metrics
+from .revocation import register_revocation
+from .subs_client import SubsClient
 from redis import Redis
 
 jwt = JWTManager()
@@ -14,6 +22,11 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    # Logger 설정: 큐에 넣기만 하고 JSON 포맷팅/쓰기는 리스너 스레드에서 처리, 요청 ID 전파
+    init_logging(app)
+    # 요청 지연 시간, 캐시 hit/miss, sm-subs 호출 지표 (/metrics)
+    init_metrics(app)
+
     app.redis = Redis(
         host=app.config['REDIS_HOST'],
         port=app.config['REDIS_PORT'],
@@ -22,6 +35,17 @@ def create_app():
         decode_responses=True
     )
 
+    # 프로세스 내 LRU + Redis 2단계 캐시, pub/sub로 다른 프로세스의 1차 캐시 무효화
+    app.cache = TwoTierCache.from_app(app)
+    # sm-subs 구독 변경 이벤트를 받아 해당 사용자의 추천 캐시만 제거
+    register_subscription_events(app)
+    app.cache.start_listener()
+
+    # sm-subs 호출용 공유 HTTP 클라이언트 (keep-alive 연결 풀)
+    app.subs_client = SubsClient.from_config(app.config)
+    # sm-subs 호출을 동시에 진행하기 위한 스레드 풀
+    app.executor = ThreadPoolExecutor(max_workers=app.config['SUBS_FETCH_WORKERS'])
+
     # CORS 허용 도메인을 환경 변수에서 가져오기
     allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173').split(',')
 
@@ -29,22 +53,30 @@ def create_app():
     CORS(app, resources={r"/*": {"origins": allowed_origins}}, supports_credentials=True)
 
     jwt.init_app(app)
+    # 비활성 사용자(sm-user 발행)의 토큰은 JWT 검사 단계에서 거절
+    register_revocation(app, jwt)
 
-    # Logger 설정
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    app.logger.addHandler(handler)
-
-    # 로깅 레벨 설정
-    app.logger.setLevel(logging.INFO)
-    app.logger.info("Flask application started")
+    # /health/ready 의존성 점검 (제한 시간 + 짧은 결과 캐시)
+    app.readiness = ReadinessChecker.from_app(app)
 
     from app.routes import bp as api_bp
     CORS(api_bp)
     app.register_blueprint(api_bp)
 
+    app.logger.info("Flask application started")
     return app
+
+
+def reinit_after_fork(app):
+    """
+    마스터에서 만든 앱을 fork한 워커에서 호출한다. 스레드는 fork 후 남지 않으므로
+    pub/sub 리스너와 스레드 풀을 다시 만들고, 부모와 공유하는 Redis/HTTP 연결은 버린다.
+    """
+    app.log_pipeline.reinit_after_fork()
+    app.redis.connection_pool.reset()
+    app.subs_client = SubsClient.from_config(app.config)
+    app.executor = ThreadPoolExecutor(max_workers=app.config['SUBS_FETCH_WORKERS'])
+    reset_catalog_after_fork()
+    app.cache.start_listener()
+    app.deactivated_users.start_listener()
+    app.readiness = ReadinessChecker.from_app(app)
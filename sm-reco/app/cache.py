@@ -0,0 +1,157 @@
+"""
+2단계 캐시 (프로세스 내 LRU/TTL + Redis).
+
+1차 캐시는 이미 파싱된 파이썬 객체를 보관하므로 히트 시 네트워크 왕복과 json.loads가 없다.
+값을 쓰거나 지우면 Redis pub/sub 채널로 키를 알려 다른 프로세스의 1차 캐시를 비운다.
+1차 캐시에 보관된 객체는 여러 요청이 공유하므로 호출하는 쪽에서 수정하면 안 된다.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from redis.exceptions import RedisError
+
+
+class LocalCache:
+    """
+    크기 제한과 항목별 만료 시간을 가진 스레드 안전 LRU 캐시.
+    """
+
+    def __init__(self, maxsize, default_ttl):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class TwoTierCache:
+
+    def __init__(self, redis, maxsize, local_ttl, channel, logger):
+        self.redis = redis
+        self.local = LocalCache(maxsize, local_ttl)
+        self.channel = channel
+        self.logger = logger
+        self.instance_id = uuid.uuid4().hex
+        self._handlers = {channel: self._handle_message}
+        self._listener = None
+
+    @classmethod
+    def from_app(cls, app):
+        return cls(
+            redis=app.redis,
+            maxsize=app.config['LOCAL_CACHE_MAX_ITEMS'],
+            local_ttl=app.config['LOCAL_CACHE_TTL_SECOND'],
+            channel=app.config['CACHE_INVALIDATION_CHANNEL'],
+            logger=app.logger,
+        )
+
+    def get_json(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        cached = self.redis.get(key)
+        if cached is None:
+            return None
+        value = json.loads(cached)
+        self.local.set(key, value)
+        return value
+
+    def set_json(self, key, value, ex):
+        seconds = int(ex.total_seconds()) if hasattr(ex, 'total_seconds') else int(ex)
+        self.redis.setex(key, seconds, json.dumps(value))
+        self.local.set(key, value, seconds)
+        self.publish_invalidation(key)
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        self.redis.delete(*keys)
+        self.invalidate(*keys)
+
+    def invalidate(self, *keys):
+        """
+        Redis 값은 그대로 두고 모든 프로세스의 1차 캐시에서만 키를 지운다.
+        """
+        self.local.delete(*keys)
+        self.publish_invalidation(*keys)
+
+    def publish_invalidation(self, *keys):
+        try:
+            self.redis.publish(self.channel, json.dumps({'origin': self.instance_id, 'keys': list(keys)}))
+        except RedisError as e:
+            self.logger.warning('Failed to publish cache invalidation: %s', e)
+
+    def _handle_message(self, message):
+        payload = json.loads(message['data'])
+        if payload.get('origin') == self.instance_id:
+            return
+        self.local.delete(*payload.get('keys', []))
+
+    def add_handler(self, channel, handler):
+        """
+        같은 pub/sub 연결에서 함께 구독할 채널과 처리 함수를 등록한다. start_listener 전에 호출한다.
+        """
+        self._handlers[channel] = handler
+
+    def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(*self._handlers)
+                # (재)구독 사이에 놓친 무효화 메시지가 있을 수 있으므로 1차 캐시를 비운다
+                self.local.clear()
+                for message in pubsub.listen():
+                    if message['type'] != 'message':
+                        continue
+                    try:
+                        self._handlers[message['channel']](message)
+                    except (ValueError, KeyError) as e:
+                        self.logger.warning('Ignored malformed pub/sub message on %s: %s', message["channel"], e)
+                    except Exception as e:
+                        # 처리 함수 하나의 오류로 리스너가 멈추면 1차 캐시가 계속 오래된 값을 제공하게 된다
+                        self.logger.error('Failed to handle pub/sub message on %s: %s',
+                                          message["channel"], e, exc_info=True)
+            except RedisError as e:
+                self.logger.warning('Cache invalidation listener error: %s', e)
+                time.sleep(1)
+            except Exception as e:
+                self.logger.error('Unexpected cache invalidation listener error: %s', e, exc_info=True)
+                time.sleep(1)
+            finally:
+                pubsub.close()
+
+    def start_listener(self):
+        if self._listener is None or not self._listener.is_alive():
+            self._listener = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+            self._listener.start()
@@ -0,0 +1,241 @@
+"""
+SUB_PLANS 카탈로그 캐시.
+
+2단계 캐시(app.cache)의 SUB_PLANS 키에는 플랜 목록과 함께 논리 만료 시각(expires_at), 마지막 조회에
+걸린 시간(delta), sm-subs가 준 ETag를 담은 envelope를 저장한다.
+물리 TTL은 SUBS_STALE_CACHE_TTL_SECOND로 길게 두어, 논리 만료 이후에도
+갱신이 끝날 때까지(또는 sm-subs 장애 동안) 이전 값을 계속 제공한다.
+
+- 단일 갱신(single-flight): Redis 락을 잡은 워커 하나만 sm-subs를 호출한다.
+- 조기 갱신: 만료 직전에 확률적으로 갱신을 시작한다 (XFetch, delta * beta * -ln(rand)).
+- stale-while-revalidate: 값이 있으면 갱신은 백그라운드에서 진행하고 이전 값을 즉시 반환한다.
+"""
+import contextvars
+import math
+import random
+import threading
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+from flask import current_app
+from redis.exceptions import LockError
+from requests import RequestException
+
+from .auth import service_headers
+from .config import Config
+from .metrics import record_cache
+
+# 프로세스 안에서 백그라운드 갱신 작업이 중복으로 제출되지 않도록 막는다
+_refresh_in_flight = threading.Lock()
+
+
+def reset_after_fork():
+    """
+    fork 시점에 부모의 다른 스레드가 잡고 있던 락은 자식에서 영원히 풀리지 않으므로 새로 만든다.
+    """
+    global _refresh_in_flight
+    _refresh_in_flight = threading.Lock()
+
+
+def lock_key():
+    return f"{Config.CACHE_KEY}:lock"
+
+
+def read_envelope():
+    envelope = current_app.cache.get_json(Config.CACHE_KEY)
+    if not envelope:
+        return None
+    if isinstance(envelope, list):
+        # 이전 형식(플랜 목록만 저장)은 즉시 갱신 대상으로 취급
+        return {'plans': envelope, 'etag': None, 'expires_at': 0, 'delta': 0}
+    return envelope
+
+
+def write_envelope(plans, etag, delta):
+    envelope = {
+        'plans': plans,
+        'etag': etag,
+        'expires_at': time.time() + Config.SUBS_CACHE_TTL_SECOND,
+        'delta': delta,
+    }
+    current_app.cache.set_json(
+        Config.CACHE_KEY,
+        envelope,
+        timedelta(seconds=Config.SUBS_STALE_CACHE_TTL_SECOND)
+    )
+    return envelope
+
+
+def should_refresh(envelope):
+    """
+    XFetch 확률적 조기 갱신: 만료가 가까울수록, 조회가 오래 걸릴수록 갱신 확률이 높아진다.
+    """
+    early = envelope['delta'] * Config.SUBS_CACHE_EARLY_REFRESH_BETA * -math.log(1.0 - random.random())
+    return time.time() + early >= envelope['expires_at']
+
+
+def fetch_and_store(headers, envelope=None):
+    """
+    sm-subs에서 카탈로그를 조회해 캐시에 저장하고 새 envelope를 반환한다. 실패하면 None.
+    이전 envelope의 ETag로 조건부 요청을 보내 304이면 기존 목록의 만료만 연장한다.
+    """
+    request_headers = dict(headers)
+    if envelope and envelope.get('etag'):
+        request_headers['If-None-Match'] = envelope['etag']
+
+    started = time.monotonic()
+    try:
+        response = current_app.subs_client.get('/sub/plans', headers=request_headers)
+    except RequestException as e:
+        current_app.logger.warning('Failed to reach subscription service for plans: %s', e)
+        return None
+    delta = time.monotonic() - started
+
+    if response.status_code == HTTPStatus.NOT_MODIFIED and envelope:
+        current_app.logger.info('Subscription plans not modified; extended cache')
+        return write_envelope(envelope['plans'], envelope['etag'], delta)
+
+    if response.status_code != HTTPStatus.OK:
+        return None
+
+    envelope = write_envelope(response.json(), response.headers.get('ETag'), delta)
+    current_app.logger.info("Fetched subscription plans from API and cached them")
+    return envelope
+
+
+def refresh_with_lock(headers, envelope=None):
+    """
+    락을 잡은 경우에만 갱신하고 (락 획득 여부, envelope) 튜플을 반환한다.
+    """
+    lock = current_app.redis.lock(
+        lock_key(), timeout=Config.SUBS_CACHE_LOCK_TIMEOUT_SECOND, blocking=False
+    )
+    if not lock.acquire():
+        return False, None
+    try:
+        return True, fetch_and_store(headers, envelope)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # 락이 만료된 뒤 다른 워커가 가져간 경우
+            pass
+
+
+def _background_refresh(app, envelope):
+    with app.app_context():
+        try:
+            # 요청이 끝난 뒤 실행되므로 만료되거나 폐기될 수 있는 사용자 토큰 대신 서비스 토큰을 쓴다
+            refresh_with_lock(service_headers(), envelope)
+        except Exception as e:
+            app.logger.error('Background subscription plan refresh failed: %s', e, exc_info=True)
+        finally:
+            _refresh_in_flight.release()
+
+
+def wait_for_envelope():
+    """
+    다른 워커가 갱신 중일 때 값이 채워지기를 잠시 기다린다.
+    """
+    deadline = time.monotonic() + Config.SUBS_CACHE_LOCK_WAIT_SECOND
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        envelope = read_envelope()
+        if envelope:
+            return envelope
+    return None
+
+
+def get_envelope(headers):
+    """
+    카탈로그 envelope를 반환한다. 조회할 수 없으면 None.
+    """
+    envelope = read_envelope()
+    if envelope is None:
+        record_cache('sub_plans', False)
+    else:
+        # 논리 만료가 지난 값은 stale로 기록 (stale-while-revalidate로 제공)
+        record_cache('sub_plans', 'stale' if envelope['expires_at'] <= time.time() else True)
+
+    if envelope:
+        if should_refresh(envelope) and _refresh_in_flight.acquire(blocking=False):
+            # 이전 값을 즉시 반환하고, 갱신은 락을 잡은 워커 하나가 백그라운드에서 진행
+            try:
+                current_app.executor.submit(
+                    contextvars.copy_context().run,
+                    _background_refresh, current_app._get_current_object(), envelope
+                )
+            except Exception as e:
+                # 종료 중인 스레드 풀 등으로 제출하지 못하면 다음 요청이 다시 시도할 수 있게 락을 푼다
+                _refresh_in_flight.release()
+                current_app.logger.warning('Could not schedule subscription plan refresh: %s', e)
+        return envelope
+
+    # 캐시가 완전히 비어 있는 경우: 한 워커만 조회하고 나머지는 결과를 기다린다
+    acquired, envelope = refresh_with_lock(headers)
+    if acquired:
+        return envelope
+
+    envelope = wait_for_envelope()
+    if envelope:
+        return envelope
+
+    # 갱신 중인 워커가 제때 끝내지 못하면 직접 조회
+    current_app.logger.warning('Timed out waiting for subscription plan refresh; fetching directly')
+    return fetch_and_store(headers)
+
+
+class PlanIndex:
+    """
+    카탈로그 버전마다 한 번 만드는 제공업체별 플랜 인덱스.
+    요청마다 전체 카탈로그를 훑는 대신 제공업체 집합 차집합과 샘플링만 수행한다.
+    """
+
+    def __init__(self, plans):
+        plans_by_provider = {}
+        for plan in plans:
+            plans_by_provider.setdefault(plan['provider_name'], []).append(plan)
+        self.plans_by_provider = {name: tuple(group) for name, group in plans_by_provider.items()}
+        self.plan_ids_by_provider = {
+            name: frozenset(plan['id'] for plan in group)
+            for name, group in self.plans_by_provider.items()
+        }
+        self.providers = frozenset(self.plans_by_provider)
+
+    def pick(self, user_subscriptions_ids, user_subscribed_providers, count):
+        """
+        사용자가 구독하지 않은 제공업체 중 count개를 고르고, 각 제공업체에서 플랜 하나를 무작위로 고른다.
+        """
+        candidates = []
+        for provider_name in self.providers - user_subscribed_providers:
+            plans = self.plans_by_provider[provider_name]
+            if not self.plan_ids_by_provider[provider_name].isdisjoint(user_subscriptions_ids):
+                plans = [plan for plan in plans if plan['id'] not in user_subscriptions_ids]
+                if not plans:
+                    continue
+            candidates.append(plans)
+
+        chosen = random.sample(candidates, min(count, len(candidates)))
+        return [random.choice(plans) for plans in chosen]
+
+
+# (카탈로그 버전, PlanIndex) - 프로세스 내에서 카탈로그 버전이 바뀔 때만 다시 만든다
+_plan_index = (None, None)
+
+
+def get_plan_index(headers):
+    """
+    현재 카탈로그 버전의 PlanIndex를 반환한다. 카탈로그를 조회할 수 없으면 None.
+    """
+    global _plan_index
+    envelope = get_envelope(headers)
+    if envelope is None:
+        return None
+
+    version = envelope.get('etag') or envelope.get('expires_at')
+    cached_version, index = _plan_index
+    if index is None or cached_version != version:
+        index = PlanIndex(envelope['plans'])
+        _plan_index = (version, index)
+    return index
@@ -15,4 +15,52 @@ class Config:
     SUBS_CACHE_TTL_SECOND = int(os.getenv('SUBS_CACHE_TTL_SECOND', '60'))
 
     RECOMMEND_COUNT = os.getenv('RECOMMEND_COUNT', '1')
-    RECOMMEND_CACHE_TTL_SECOND = int(os.getenv('RECOMMEND_CACHE_TTL_SECOND', '60'))
\ No newline at end of file
+    # 구독 변경 이벤트로 즉시 무효화되지만, pub/sub 메시지를 놓친 경우의 최대 지연이 되므로 짧게 둔다
+    RECOMMEND_CACHE_TTL_SECOND = int(os.getenv('RECOMMEND_CACHE_TTL_SECOND', '60'))
+
+    # 내부 서비스 간 호출 인증 토큰 (비어 있으면 내부 API 비활성화)
+    INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+    # 배치 추천 시 sm-subs 대량 조회 1회당 사용자 수
+    BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '500'))
+    BATCH_MAX_USER_IDS = int(os.getenv('BATCH_MAX_USER_IDS', '10000'))
+
+    # sm-subs HTTP 클라이언트 (연결 풀, 타임아웃, 재시도, 서킷 브레이커)
+    SUBS_POOL_SIZE = int(os.getenv('SUBS_POOL_SIZE', '20'))
+    SUBS_CONNECT_TIMEOUT_SECOND = float(os.getenv('SUBS_CONNECT_TIMEOUT_SECOND', '1'))
+    SUBS_READ_TIMEOUT_SECOND = float(os.getenv('SUBS_READ_TIMEOUT_SECOND', '3'))
+    SUBS_MAX_RETRIES = int(os.getenv('SUBS_MAX_RETRIES', '2'))
+    SUBS_RETRY_BACKOFF_SECOND = float(os.getenv('SUBS_RETRY_BACKOFF_SECOND', '0.1'))
+    SUBS_RETRY_BACKOFF_MAX_SECOND = float(os.getenv('SUBS_RETRY_BACKOFF_MAX_SECOND', '1'))
+    SUBS_BREAKER_FAILURE_THRESHOLD = int(os.getenv('SUBS_BREAKER_FAILURE_THRESHOLD', '5'))
+    SUBS_BREAKER_RESET_SECOND = float(os.getenv('SUBS_BREAKER_RESET_SECOND', '30'))
+    # 추천 요청에서 sm-subs 호출을 동시에 진행할 스레드 수
+    SUBS_FETCH_WORKERS = int(os.getenv('SUBS_FETCH_WORKERS', '20'))
+    # 논리 만료(SUBS_CACHE_TTL_SECOND) 이후에도 갱신 중이나 sm-subs 장애 시 제공할 카탈로그 보관 시간
+    SUBS_STALE_CACHE_TTL_SECOND = int(os.getenv('SUBS_STALE_CACHE_TTL_SECOND', '86400'))
+    # 카탈로그 조기 갱신 강도 (XFetch beta, 0이면 조기 갱신 없음)
+    SUBS_CACHE_EARLY_REFRESH_BETA = float(os.getenv('SUBS_CACHE_EARLY_REFRESH_BETA', '1'))
+    # 카탈로그 갱신 락 유지 시간 / 캐시가 비었을 때 다른 워커의 갱신을 기다리는 시간
+    SUBS_CACHE_LOCK_TIMEOUT_SECOND = float(os.getenv('SUBS_CACHE_LOCK_TIMEOUT_SECOND', '10'))
+    SUBS_CACHE_LOCK_WAIT_SECOND = float(os.getenv('SUBS_CACHE_LOCK_WAIT_SECOND', '2'))
+
+    # 프로세스 내 1차 캐시 (파싱된 객체 보관) 크기 / 최대 보관 시간, 무효화 pub/sub 채널
+    LOCAL_CACHE_MAX_ITEMS = int(os.getenv('LOCAL_CACHE_MAX_ITEMS', '1024'))
+    LOCAL_CACHE_TTL_SECOND = int(os.getenv('LOCAL_CACHE_TTL_SECOND', '30'))
+    CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate')
+    # sm-subs 구독 변경 이벤트 pub/sub 채널
+    SUBSCRIPTION_EVENTS_CHANNEL = os.getenv('SUBSCRIPTION_EVENTS_CHANNEL', 'subscription.events')
+
+    # sm-user가 관리하는 비활성 사용자 집합 (JWT 검사에서 토큰 거절)
+    DEACTIVATED_USERS_KEY = os.getenv('DEACTIVATED_USERS_KEY', 'users:deactivated')
+    USER_STATUS_CHANNEL = os.getenv('USER_STATUS_CHANNEL', 'user.status')
+    DEACTIVATED_USERS_REFRESH_SECOND = int(os.getenv('DEACTIVATED_USERS_REFRESH_SECOND', '60'))
+
+    # 로깅: 큐 기반 JSON 로그. 큐가 가득 차면 로그를 버린다
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # 호출이 많은 엔드포인트 로거의 INFO 로그 샘플링 비율 ('로거=비율,...'), WARNING 이상은 모두 남긴다
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', 'app.routes.recommend=0.1')
+
+    # /health/ready 의존성 점검 제한 시간과 결과 재사용 시간
+    READINESS_TIMEOUT_SECOND = float(os.getenv('READINESS_TIMEOUT_SECOND', '1'))
+    READINESS_CACHE_SECOND = float(os.getenv('READINESS_CACHE_SECOND', '2'))
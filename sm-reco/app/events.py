@@ -0,0 +1,103 @@
+"""
+sm-subs 구독 변경 이벤트 처리.
+
+sm-subs는 구독 생성/취소/만료가 커밋되면 영향을 받은 사용자 ID를 pub/sub로 발행한다.
+모든 sm-reco 프로세스가 같은 이벤트를 받으므로 이벤트 ID로 한 프로세스만 Redis 작업을 맡는다.
+맡은 프로세스는 사용자별 세대(generation) 값을 올리고 Redis의 추천 결과를 지우며,
+나머지 프로세스는 자신의 1차 캐시만 비운다.
+
+추천 결과는 계산을 시작할 때 읽은 세대가 저장 시점에도 같을 때만 저장하므로,
+변경 전 구독으로 계산된 결과가 무효화 이후에 다시 캐시되지 않는다.
+pub/sub는 최대 한 번 전달이라 놓친 이벤트는 RECOMMEND_CACHE_TTL_SECOND가 지나야 반영된다.
+"""
+import json
+
+from redis.exceptions import WatchError
+
+SUBSCRIPTION_CHANGED = 'subscription.changed'
+
+# 이벤트 처리 담당 프로세스를 정하는 키의 보관 시간
+EVENT_CLAIM_TTL_SECOND = 60
+# 세대 값은 진행 중인 추천 계산보다 오래 남아 있으면 충분하다
+GENERATION_TTL_SECOND = 86400
+
+
+def recommendation_cache_key(user_id):
+    return f"user:{user_id}:recommendation"
+
+
+def recommendation_generation_key(user_id):
+    return f"user:{user_id}:recommendation:gen"
+
+
+def read_generations(redis, user_ids):
+    """
+    사용자별 현재 세대 값을 {user_id: 값(없으면 None)}으로 반환한다. 추천 계산을 시작하기 전에 읽는다.
+    """
+    if not user_ids:
+        return {}
+    values = redis.mget([recommendation_generation_key(user_id) for user_id in user_ids])
+    return dict(zip(user_ids, values))
+
+
+def cache_recommendations(cache, recommendations, generations, ttl):
+    """
+    {user_id: 추천 목록}을 한 트랜잭션으로 저장한다. 세대 값이 generations와 달라진 사용자는 건너뛴다.
+    저장한 사용자 ID 목록을 반환한다.
+    """
+    if not recommendations:
+        return []
+    seconds = int(ttl.total_seconds()) if hasattr(ttl, 'total_seconds') else int(ttl)
+    generation_keys = [recommendation_generation_key(user_id) for user_id in recommendations]
+    with cache.redis.pipeline() as pipe:
+        try:
+            pipe.watch(*generation_keys)
+            current = dict(zip(recommendations, pipe.mget(generation_keys)))
+            stored = [user_id for user_id in recommendations if current[user_id] == generations.get(user_id)]
+            pipe.multi()
+            for user_id in stored:
+                pipe.setex(recommendation_cache_key(user_id), seconds, json.dumps(recommendations[user_id]))
+            pipe.execute()
+        except WatchError:
+            # 저장 도중 일부 사용자의 구독이 바뀌었으면 이번 묶음은 캐시하지 않는다
+            return []
+    if stored:
+        # 다른 프로세스의 1차 캐시에 남아 있을 이전 추천 결과 제거
+        cache.invalidate(*[recommendation_cache_key(user_id) for user_id in stored])
+    return stored
+
+
+def register_subscription_events(app):
+    cache = app.cache
+
+    def claim_event(payload):
+        event_id = payload.get('id')
+        if not event_id:
+            # ID가 없는 이벤트는 중복 여부를 알 수 없으므로 모든 프로세스가 처리한다
+            return True
+        return bool(cache.redis.set(
+            f"{app.config['SUBSCRIPTION_EVENTS_CHANNEL']}:claimed:{event_id}", 1,
+            nx=True, ex=EVENT_CLAIM_TTL_SECOND
+        ))
+
+    def handle_subscription_event(message):
+        payload = json.loads(message['data'])
+        if payload.get('event') != SUBSCRIPTION_CHANGED:
+            return
+        user_ids = payload['user_ids']
+        keys = [recommendation_cache_key(user_id) for user_id in user_ids]
+        if not keys:
+            return
+        # 1차 캐시는 프로세스마다 비우고, 무효화 메시지는 다시 발행하지 않는다
+        cache.local.delete(*keys)
+        if not claim_event(payload):
+            return
+        pipe = cache.redis.pipeline(transaction=True)
+        for user_id in user_ids:
+            pipe.incr(recommendation_generation_key(user_id))
+            pipe.expire(recommendation_generation_key(user_id), GENERATION_TTL_SECOND)
+        pipe.delete(*keys)
+        pipe.execute()
+        app.logger.info('Evicted recommendations for users %s after subscription change', user_ids)
+
+    cache.add_handler(app.config['SUBSCRIPTION_EVENTS_CHANNEL'], handle_subscription_event)
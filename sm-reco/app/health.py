@@ -0,0 +1,95 @@
+"""
+준비 상태(readiness) 점검.
+
+Redis에 PING을 보내고, sm-subs의 /health/live를 호출한다.
+점검은 전용 스레드 풀에서 동시에 실행하고 READINESS_TIMEOUT_SECOND가 지나면 timeout으로 보고한다.
+결과는 READINESS_CACHE_SECOND 동안 재사용하므로 프로브가 잦아도 의존성에 주는 부하는 일정하다.
+제한 시간을 넘긴 점검은 끝날 때까지 다시 제출하지 않아 느린 의존성 때문에 스레드가 쌓이지 않는다.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+
+def _timed_check(fn):
+    started = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        # 연결 문자열 등이 노출되지 않도록 예외 종류만 보고한다
+        return {'status': 'error', 'error': type(e).__name__,
+                'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+    return {'status': 'ok', 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+class ReadinessChecker:
+
+    def __init__(self, checks, timeout, cache_ttl):
+        self.checks = checks
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self._executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix='readiness')
+        # 이전 점검에서 제한 시간을 넘겨 아직 실행 중인 작업 (이름 -> Future)
+        self._running = {}
+        self._report = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_app(cls, app):
+        timeout = app.config['READINESS_TIMEOUT_SECOND']
+
+        def subs_check():
+            # 재시도와 서킷 브레이커를 거치지 않고 한 번만 호출한다 (fork 후 새로 만든 클라이언트를 사용)
+            client = app.subs_client
+            response = client.session.get(f'{client.base_url}/health/live', timeout=timeout)
+            response.raise_for_status()
+
+        return cls(
+            {'redis': app.redis.ping, 'sm-subs': subs_check},
+            timeout=timeout,
+            cache_ttl=app.config['READINESS_CACHE_SECOND'],
+        )
+
+    def _run_checks(self):
+        futures = {}
+        for name, fn in self.checks.items():
+            future = self._running.get(name)
+            if future is None or future.done():
+                future = self._executor.submit(_timed_check, fn)
+            futures[name] = future
+
+        done, _ = wait(futures.values(), timeout=self.timeout)
+        results = {}
+        for name, future in futures.items():
+            if future in done:
+                self._running.pop(name, None)
+                result = future.result()
+                # 이전 점검에서 이어진 작업이 이번에 끝난 경우에도 제한 시간을 넘겼으면 timeout으로 본다
+                if result['status'] == 'ok' and result['latency_ms'] > self.timeout * 1000:
+                    result['status'] = 'timeout'
+                results[name] = result
+            else:
+                self._running[name] = future
+                results[name] = {'status': 'timeout', 'latency_ms': round(self.timeout * 1000, 2)}
+        return results
+
+    def status(self):
+        """
+        (준비 여부, 보고서) 튜플을 반환한다. 캐시된 결과가 유효하면 점검을 다시 실행하지 않는다.
+        """
+        with self._lock:
+            if self._report is None or time.monotonic() - self._checked_at >= self.cache_ttl:
+                results = self._run_checks()
+                ready = all(result['status'] == 'ok' for result in results.values())
+                self._report = (ready, {
+                    'status': 'ok' if ready else 'unavailable',
+                    'checked_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'checks': results,
+                })
+                self._checked_at = time.monotonic()
+            return self._report
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,92 @@
+"""
+Prometheus 지표와 /metrics 엔드포인트.
+
+- 요청 지연 시간: 라우트(url_rule)·메서드·상태 코드별 히스토그램
+- 캐시: 캐시 이름별 hit/miss 카운터 (SUB_PLANS, user:*:recommendation 조회 지점에서 record_cache로 기록)
+- 외부 호출: sm-subs 호출 시도마다 경로·상태 코드별 히스토그램 (SubsClient)
+- 로그: 큐가 가득 차서 버린 로그 레코드 수 (NonBlockingQueueHandler)
+
+Gunicorn 워커마다 지표가 따로 쌓이므로 PROMETHEUS_MULTIPROC_DIR이 설정되어 있으면
+모든 워커의 지표 파일을 합쳐서 내보낸다 (gunicorn.conf.py에서 설정).
+"""
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ['method', 'endpoint', 'status'],
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by result',
+    ['cache', 'result'],
+)
+LOG_RECORDS_DROPPED = Counter(
+    'log_records_dropped_total', 'Log records dropped because the log queue was full',
+)
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'Latency of calls to other services (per attempt)',
+    ['upstream', 'method', 'path', 'status'],
+)
+
+
+def record_cache(cache, hit):
+    """
+    캐시 조회 결과를 기록한다. hit은 True/False 또는 'stale' 같은 결과 이름.
+    """
+    if hit is True:
+        result = 'hit'
+    elif hit is False:
+        result = 'miss'
+    else:
+        result = hit
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+def observe_upstream(upstream, method, path, status, seconds):
+    """
+    외부 서비스 호출 한 번의 소요 시간을 기록한다. 연결 오류/타임아웃은 status='error'.
+    """
+    UPSTREAM_LATENCY.labels(upstream, method, path, status).observe(seconds)
+
+
+def metrics_response():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+def init_metrics(app):
+    """
+    요청 계측 훅과 /metrics 엔드포인트를 등록한다.
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, endpoint, response.status_code).observe(
+            time.perf_counter() - started
+        )
+        return response
+
+    # init_logging이 먼저 만든 로그 큐 핸들러가 버린 레코드를 카운터로 센다
+    pipeline = getattr(app, 'log_pipeline', None)
+    if pipeline is not None:
+        pipeline.handler.on_drop = LOG_RECORDS_DROPPED.inc
+
+    app.add_url_rule('/metrics', 'metrics', metrics_response, methods=['GET'])
@@ -1,15 +1,60 @@
 from flask import Blueprint, jsonify, current_app, request
 from http import HTTPStatus
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import requests
-import os
-import random
+from requests import RequestException
+from .auth import internal_api_required, service_headers
+from .catalog import get_plan_index
 from .config import Config
-import json
+from .events import cache_recommendations, read_generations, recommendation_cache_key
+from .metrics import record_cache
+import contextvars
+import logging
 from datetime import timedelta
 
 bp = Blueprint('api', __name__)
 
+# 호출이 많은 추천 엔드포인트의 로거 (LOG_SAMPLE_RATES로 INFO 로그 샘플링)
+recommend_logger = logging.getLogger(f'{__name__}.recommend')
+
+
+def fetch_user_subscriptions(access_token):
+    """
+    현재 사용자의 구독 플랜 목록을 sm-subs에서 조회한다. 실패하면 None을 반환한다.
+    """
+    try:
+        user_subscriptions_response = current_app.subs_client.get(
+            '/sub/plans/user',
+            headers={'Authorization': access_token}
+        )
+    except RequestException as e:
+        current_app.logger.warning('Failed to reach subscription service for user plans: %s', e)
+        return None
+
+    if user_subscriptions_response.status_code != HTTPStatus.OK:
+        return None
+    return user_subscriptions_response.json()
+
+
+def run_in_app_context(app, fn, *args):
+    # 스레드 풀 작업에서 current_app을 사용할 수 있도록 애플리케이션 컨텍스트를 연다
+    with app.app_context():
+        return fn(*args)
+
+
+def is_user_id_list(value):
+    """
+    배치 요청의 user_ids가 정수 목록이면 True (bool은 int의 하위 타입이라 isinstance로는 걸러지지 않는다).
+    """
+    return isinstance(value, list) and all(type(user_id) is int for user_id in value)
+
+
+def pick_recommendations(plan_index, user_subscriptions_ids, user_subscribed_providers):
+    """
+    사용자가 구독하지 않은 플랜 중에서 provider별로 하나씩 뽑은 뒤 RECOMMEND_COUNT개를 추천한다.
+    """
+    return plan_index.pick(user_subscriptions_ids, user_subscribed_providers, int(Config.RECOMMEND_COUNT))
+
+
 @bp.route('/recommend', methods=['POST'])
 @jwt_required()
 def recommend_subscription_plan():
@@ -18,96 +63,151 @@ def recommend_subscription_plan():
     """
     try:
         current_user_id = get_jwt_identity()
-        current_app.logger.info(f'Fetching subscription recommendation for user {current_user_id}')
+        recommend_logger.info('Fetching subscription recommendation for user %s', current_user_id)
 
         # force=true 여부 확인
         force_recommend = request.args.get('force', 'false').lower() == 'true'
 
         # 사용자별 캐시 확인
-        user_cache_key = f"user:{current_user_id}:recommendation"
+        user_cache_key = recommendation_cache_key(current_user_id)
         if not force_recommend:
-            cached_recommendation = current_app.redis.get(user_cache_key)
+            cached_recommendation = current_app.cache.get_json(user_cache_key)
+            record_cache('recommendation', bool(cached_recommendation))
             if cached_recommendation:
-                current_app.logger.info(f'Returned cached recommendation for user {current_user_id}')
+                recommend_logger.info('Returned cached recommendation for user %s', current_user_id)
                 return jsonify({
-                    'recommends': json.loads(cached_recommendation)
+                    'recommends': cached_recommendation
                 }), HTTPStatus.OK
         else:
-            current_app.logger.info(f'Force recommendation triggered by user {current_user_id}')
+            recommend_logger.info('Force recommendation triggered by user %s', current_user_id)
 
-        # 현재 사용자의 구독 플랜 조회 API 호출
+        # 구독 조회 전에 세대 값을 읽어 두고, 계산 중에 구독이 바뀌었으면 결과를 캐시하지 않는다
+        generations = read_generations(current_app.redis, [current_user_id])
+
+        # 현재 사용자의 구독 플랜 조회는 스레드 풀에서, 전체 플랜 인덱스 조회는 현재 스레드에서 동시에 진행
         access_token = request.headers.get('Authorization')
-        user_subscriptions_response = requests.get(
-            f'{os.getenv("SUB_URL")}/sub/plans/user',
-            headers={'Authorization': access_token}
+        # 요청 ID가 스레드 풀 작업의 로그와 sm-subs 호출에도 이어지도록 현재 컨텍스트를 복사해 실행
+        user_subscriptions_future = current_app.executor.submit(
+            contextvars.copy_context().run,
+            run_in_app_context, current_app._get_current_object(), fetch_user_subscriptions, access_token
         )
+        plan_index = get_plan_index({'Authorization': access_token})
+        user_subscriptions_list = user_subscriptions_future.result()
 
-        if user_subscriptions_response.status_code != HTTPStatus.OK:
+        if user_subscriptions_list is None:
             return jsonify({
                 'error': 'Failed to fetch user subscription plans.'
             }), HTTPStatus.INTERNAL_SERVER_ERROR
 
-        user_subscriptions_list = user_subscriptions_response.json()
-        user_subscriptions_ids = {sub['plan']['id'] for sub in user_subscriptions_list}
-        user_subscribed_providers = {sub['plan']['provider_name'] for sub in user_subscriptions_list}
-
-        # 전체 플랜 캐시 확인
-        cached_all_plans = current_app.redis.get(Config.CACHE_KEY)
-        if cached_all_plans:
-            all_plans_list = json.loads(cached_all_plans)
-        else:
-            all_plans_response = requests.get(
-                f'{os.getenv("SUB_URL")}/sub/plans',
-                headers={'Authorization': access_token}
-            )
-            if all_plans_response.status_code != HTTPStatus.OK:
-                return jsonify({
-                    'error': 'Failed to fetch available subscription plans.'
-                }), HTTPStatus.INTERNAL_SERVER_ERROR
-
-            all_plans_list = all_plans_response.json()
-
-            # 캐시에 저장
-            current_app.redis.setex(
-                Config.CACHE_KEY,
-                timedelta(seconds=Config.SUBS_CACHE_TTL_SECOND),
-                json.dumps(all_plans_list)
-            )
-            current_app.logger.info("Fetched subscription plans from API and cached them")
-
-        # 사용자가 구독하지 않은 플랜 필터링 (같은 provider_name 제외)
-        provider_plan_map = {}
-        for plan in all_plans_list:
-            if plan['id'] not in user_subscriptions_ids and plan['provider_name'] not in user_subscribed_providers:
-                if plan['provider_name'] not in provider_plan_map:
-                    provider_plan_map[plan['provider_name']] = []
-                provider_plan_map[plan['provider_name']].append(plan)
+        if plan_index is None:
+            return jsonify({
+                'error': 'Failed to fetch available subscription plans.'
+            }), HTTPStatus.INTERNAL_SERVER_ERROR
 
-        # 각 provider에서 하나씩 랜덤 선택
-        filtered_plans = [random.choice(plans) for plans in provider_plan_map.values()]
+        recommended_plans = pick_recommendations(
+            plan_index,
+            {sub['plan']['id'] for sub in user_subscriptions_list},
+            {sub['plan']['provider_name'] for sub in user_subscriptions_list}
+        )
 
-        if not filtered_plans:
+        if not recommended_plans:
             return jsonify({
                 'message': 'No available subscription plans to recommend.'
             }), HTTPStatus.OK
 
-        # 무작위 추천 
-        recommended_plans = random.sample(filtered_plans, min(int(Config.RECOMMEND_COUNT), len(filtered_plans)))
-
         # 사용자별 캐시에 추천 결과 저장
-        current_app.redis.setex(
-            user_cache_key,
-            timedelta(seconds=Config.RECOMMEND_CACHE_TTL_SECOND),
-            json.dumps(recommended_plans)
+        cache_recommendations(
+            current_app.cache,
+            {current_user_id: recommended_plans},
+            generations,
+            timedelta(seconds=Config.RECOMMEND_CACHE_TTL_SECOND)
         )
 
-        current_app.logger.info(
-            f'Successfully recommended plans {[plan["id"] for plan in recommended_plans]} for user {current_user_id}')
+        recommend_logger.info(
+            'Successfully recommended plans %s for user %s', [plan["id"] for plan in recommended_plans], current_user_id)
         return jsonify({
             'recommends': recommended_plans
         }), HTTPStatus.OK
     except Exception as e:
-        current_app.logger.error(f'Error occurred while getting recommendation: {str(e)}', exc_info=True)
+        current_app.logger.error('Error occurred while getting recommendation: %s', e, exc_info=True)
+        return jsonify({
+            'error': 'An error occurred while processing your request.'
+        }), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/recommend/batch', methods=['POST'])
+@internal_api_required
+def recommend_subscription_plans_batch():
+    """
+    여러 사용자의 추천 결과를 한 번에 계산하여 캐시에 저장하는 내부/관리자용 엔드포인트
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids')
+        if not is_user_id_list(user_ids):
+            return jsonify({'error': 'user_ids must be a list of integers.'}), HTTPStatus.BAD_REQUEST
+        if len(user_ids) > Config.BATCH_MAX_USER_IDS:
+            return jsonify({'error': f'Too many user_ids (max {Config.BATCH_MAX_USER_IDS}).'}), HTTPStatus.BAD_REQUEST
+
+        user_ids = list(dict.fromkeys(user_ids))
+        current_app.logger.info('Computing batch recommendations for %s users', len(user_ids))
+
+        headers = service_headers()
+
+        # 전체 플랜은 배치 전체에서 한 번만 조회
+        plan_index = get_plan_index(headers)
+        if plan_index is None:
+            return jsonify({
+                'error': 'Failed to fetch available subscription plans.'
+            }), HTTPStatus.INTERNAL_SERVER_ERROR
+
+        recommends = {}
+        for start in range(0, len(user_ids), Config.BATCH_CHUNK_SIZE):
+            chunk = user_ids[start:start + Config.BATCH_CHUNK_SIZE]
+            generations = read_generations(current_app.redis, chunk)
+
+            # 청크 단위로 사용자 구독 정보를 대량 조회
+            try:
+                subscriptions_response = current_app.subs_client.post(
+                    '/sub/plans/users',
+                    json={'user_ids': chunk},
+                    headers=headers
+                )
+            except RequestException as e:
+                current_app.logger.warning('Failed to reach subscription service for bulk plans: %s', e)
+                subscriptions_response = None
+
+            if subscriptions_response is None or subscriptions_response.status_code != HTTPStatus.OK:
+                return jsonify({
+                    'error': 'Failed to fetch user subscription plans.'
+                }), HTTPStatus.INTERNAL_SERVER_ERROR
+            subscriptions_by_user = subscriptions_response.json()
+
+            chunk_recommends = {}
+            for user_id in chunk:
+                user_subscriptions = subscriptions_by_user.get(str(user_id), {})
+                recommended_plans = pick_recommendations(
+                    plan_index,
+                    set(user_subscriptions.get('plan_ids', [])),
+                    set(user_subscriptions.get('provider_names', []))
+                )
+                recommends[str(user_id)] = recommended_plans
+                if recommended_plans:
+                    chunk_recommends[user_id] = recommended_plans
+
+            # 추천 결과는 트랜잭션 하나로 한 번에 캐시에 저장 (조회 후 구독이 바뀐 사용자는 제외)
+            cache_recommendations(
+                current_app.cache,
+                chunk_recommends,
+                generations,
+                timedelta(seconds=Config.RECOMMEND_CACHE_TTL_SECOND)
+            )
+
+        current_app.logger.info('Cached batch recommendations for %s users', len(user_ids))
+        return jsonify({
+            'recommends': recommends
+        }), HTTPStatus.OK
+    except Exception as e:
+        current_app.logger.error('Error occurred while computing batch recommendations: %s', e, exc_info=True)
         return jsonify({
             'error': 'An error occurred while processing your request.'
         }), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -121,3 +221,20 @@ def health_check():
         'status': 'ok',
         'message': 'Server is healthy.'
     }), HTTPStatus.OK
+
+
+@bp.route('/health/live', methods=['GET'])
+def liveness_check():
+    """
+    프로세스가 요청을 처리할 수 있는지만 확인하는 엔드포인트 (의존성은 확인하지 않는다)
+    """
+    return jsonify({'status': 'ok'}), HTTPStatus.OK
+
+
+@bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    의존성을 제한 시간 안에 점검하는 엔드포인트. 하나라도 실패하거나 느리면 503을 반환한다.
+    """
+    ready, report = current_app.readiness.status()
+    return jsonify(report), HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE
@@ -0,0 +1,160 @@
+"""
+sm-subs 호출용 공유 HTTP 클라이언트.
+
+하나의 requests.Session을 프로세스 전체에서 재사용하여 keep-alive 연결 풀을 유지하고,
+모든 호출에 타임아웃, 지터가 적용된 제한 횟수 재시도, 서킷 브레이커를 적용한다.
+현재 요청 ID는 X-Request-ID 헤더로 함께 보내 sm-subs 로그와 이어지게 한다.
+"""
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logs import REQUEST_ID_HEADER, current_request_id
+from .metrics import observe_upstream
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    서킷이 열려 있어 sm-subs 호출을 시도하지 않았을 때 발생한다.
+    """
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold에 도달하면 reset_timeout 동안 호출을 차단한다.
+    차단 시간이 지나면 한 번의 시험 호출(half-open)을 허용하고, 성공하면 다시 닫힌다.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class SubsClient:
+
+    def __init__(self, base_url, pool_size, connect_timeout, read_timeout,
+                 max_retries, backoff_base, backoff_max, breaker):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            base_url=config['SUB_URL'],
+            pool_size=config['SUBS_POOL_SIZE'],
+            connect_timeout=config['SUBS_CONNECT_TIMEOUT_SECOND'],
+            read_timeout=config['SUBS_READ_TIMEOUT_SECOND'],
+            max_retries=config['SUBS_MAX_RETRIES'],
+            backoff_base=config['SUBS_RETRY_BACKOFF_SECOND'],
+            backoff_max=config['SUBS_RETRY_BACKOFF_MAX_SECOND'],
+            breaker=CircuitBreaker(
+                failure_threshold=config['SUBS_BREAKER_FAILURE_THRESHOLD'],
+                reset_timeout=config['SUBS_BREAKER_RESET_SECOND'],
+            ),
+        )
+
+    def _backoff(self, attempt):
+        # full jitter: 0 ~ min(max, base * 2^attempt)
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt))))
+
+    def _send(self, method, path, url, kwargs):
+        """
+        연결 오류/타임아웃/5xx는 max_retries만큼 재시도한다.
+        2xx~4xx 응답이나 마지막 5xx 응답을 반환하고, 마지막 시도가 예외로 끝나면 그 예외를 다시 발생시킨다.
+        """
+        response = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._backoff(attempt - 1)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                observe_upstream('sm-subs', method, path, 'error', time.perf_counter() - started)
+                if attempt == self.max_retries:
+                    raise
+                response = None
+                continue
+            except requests.exceptions.RequestException:
+                # 리다이렉트 초과, 응답 디코딩 실패 등은 재시도해도 같은 결과이므로 바로 실패로 처리한다
+                observe_upstream('sm-subs', method, path, 'error', time.perf_counter() - started)
+                raise
+            observe_upstream('sm-subs', method, path, response.status_code, time.perf_counter() - started)
+            if response.status_code < 500:
+                return response
+        return response
+
+    def request(self, method, path, **kwargs):
+        """
+        sm-subs에 요청을 보낸다. 연결 오류/타임아웃/5xx는 max_retries만큼 재시도하며,
+        모든 시도가 실패하면 마지막 5xx 응답을 반환하거나 마지막 예외를 다시 발생시킨다.
+        서킷이 열려 있으면 CircuitOpenError가 발생한다.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f'Circuit open for {self.base_url}')
+
+        kwargs.setdefault('timeout', self.timeout)
+        request_id = current_request_id()
+        if request_id:
+            kwargs['headers'] = {REQUEST_ID_HEADER: request_id, **(kwargs.get('headers') or {})}
+        try:
+            response = self._send(method, path, f'{self.base_url}{path}', kwargs)
+        except Exception:
+            # 어떤 예외로 끝나든 브레이커 상태를 정리해야 half-open 시험 호출이 풀리지 않은 채 남지 않는다
+            self.breaker.record_failure()
+            raise
+
+        if response.status_code < 500:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
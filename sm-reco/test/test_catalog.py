@@ -0,0 +1,122 @@
+"""
+추천 플랜 선택(PlanIndex.pick)과 카탈로그 조기 갱신 판단(should_refresh) 단위 테스트.
+
+실행: cd sm-reco && python -m unittest discover -s test -p 'test_*.py'
+"""
+import math
+import random
+import unittest
+from unittest import mock
+
+from app import catalog
+from app.catalog import PlanIndex, should_refresh
+from app.config import Config
+
+
+def plan(plan_id, provider_name):
+    return {'id': plan_id, 'provider_name': provider_name, 'plan_name': f'plan-{plan_id}'}
+
+
+PLANS = [
+    plan(1, 'Netflix'), plan(2, 'Netflix'),
+    plan(3, 'Spotify'),
+    plan(4, 'Disney'), plan(5, 'Disney'),
+    plan(6, 'Wavve'),
+]
+
+
+class PlanIndexPickTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = PlanIndex(PLANS)
+        random.seed(1234)
+
+    def pick_many(self, subscription_ids, subscribed_providers, count, rounds=200):
+        return [self.index.pick(set(subscription_ids), set(subscribed_providers), count) for _ in range(rounds)]
+
+    def test_returns_at_most_count_plans_from_distinct_providers(self):
+        for count in (0, 1, 2, 4):
+            for picked in self.pick_many([], [], count):
+                self.assertEqual(len(picked), count)
+                self.assertEqual(len({p['provider_name'] for p in picked}), count)
+
+    def test_returns_every_candidate_provider_when_count_exceeds_them(self):
+        for picked in self.pick_many([], ['Netflix'], 10):
+            self.assertEqual(sorted(p['provider_name'] for p in picked), ['Disney', 'Spotify', 'Wavve'])
+
+    def test_excludes_subscribed_providers(self):
+        for picked in self.pick_many([], ['Netflix', 'Disney'], 4):
+            self.assertTrue({p['provider_name'] for p in picked}.isdisjoint({'Netflix', 'Disney'}))
+
+    def test_excludes_subscribed_plans(self):
+        # Netflix 플랜 하나만 구독했으면 같은 제공업체의 다른 플랜은 추천될 수 있다
+        picked_ids = {p['id'] for picked in self.pick_many([1, 4], [], 4) for p in picked}
+        self.assertTrue(picked_ids.isdisjoint({1, 4}))
+        self.assertIn(2, picked_ids)
+        self.assertIn(5, picked_ids)
+
+    def test_skips_provider_whose_plans_are_all_subscribed(self):
+        for picked in self.pick_many([3, 6], [], 4):
+            self.assertEqual(sorted(p['provider_name'] for p in picked), ['Disney', 'Netflix'])
+
+    def test_empty_when_nothing_left(self):
+        self.assertEqual(self.index.pick({3}, {'Netflix', 'Disney', 'Wavve'}, 2), [])
+        self.assertEqual(PlanIndex([]).pick(set(), set(), 3), [])
+
+
+class ShouldRefreshTest(unittest.TestCase):
+    NOW = 1_000_000.0
+
+    def setUp(self):
+        patchers = [
+            mock.patch.object(Config, 'SUBS_CACHE_EARLY_REFRESH_BETA', 1.0),
+            mock.patch.object(catalog.time, 'time', return_value=self.NOW),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def decide(self, remaining, delta, rand):
+        envelope = {'expires_at': self.NOW + remaining, 'delta': delta}
+        with mock.patch.object(catalog.random, 'random', return_value=rand):
+            return should_refresh(envelope)
+
+    def test_expired_envelope_always_refreshes(self):
+        for rand in (0.0, 0.5, 0.999999):
+            self.assertTrue(self.decide(remaining=0, delta=1.0, rand=rand))
+            self.assertTrue(self.decide(remaining=-5, delta=0.0, rand=rand))
+
+    def test_without_fetch_time_never_refreshes_early(self):
+        for rand in (0.0, 0.5, 0.999999):
+            self.assertFalse(self.decide(remaining=0.001, delta=0.0, rand=rand))
+
+    def test_early_refresh_threshold(self):
+        # delta * beta * -ln(1 - rand) >= remaining 이면 갱신: rand >= 1 - exp(-remaining / (delta * beta))
+        remaining, delta = 2.0, 1.0
+        threshold = 1 - math.exp(-remaining / delta)
+        self.assertFalse(self.decide(remaining, delta, threshold - 1e-6))
+        self.assertTrue(self.decide(remaining, delta, threshold + 1e-6))
+        self.assertFalse(self.decide(remaining, delta, 0.0))
+
+    def test_refresh_probability_grows_near_expiry(self):
+        def envelope_at(remaining):
+            return {'expires_at': self.NOW + remaining, 'delta': 0.5}
+
+        rng = random.Random(42)
+        samples = 20000
+        with mock.patch.object(catalog.random, 'random', side_effect=rng.random):
+            rates = {
+                remaining: sum(should_refresh(envelope_at(remaining)) for _ in range(samples)) / samples
+                for remaining in (0.1, 0.5, 2.0, 10.0)
+            }
+
+        for remaining, rate in rates.items():
+            # 남은 시간 r에서의 갱신 확률은 exp(-r / (delta * beta))
+            self.assertAlmostEqual(rate, math.exp(-remaining / 0.5), delta=0.02)
+        self.assertGreater(rates[0.1], rates[0.5])
+        self.assertGreater(rates[0.5], rates[2.0])
+        self.assertLess(rates[10.0], 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+구독 변경 이벤트 처리와 세대 값 기반 추천 캐시 저장 단위 테스트 (fakeredis 사용).
+
+실행: cd sm-reco && python -m unittest discover -s test -p 'test_*.py'
+"""
+import json
+import logging
+import unittest
+from types import SimpleNamespace
+
+import fakeredis
+
+from app.cache import TwoTierCache
+from app.events import (
+    SUBSCRIPTION_CHANGED, cache_recommendations, read_generations, recommendation_cache_key,
+    recommendation_generation_key, register_subscription_events,
+)
+
+CHANNEL = 'subscription.events'
+TTL = 60
+
+
+def make_cache(server):
+    redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+    return TwoTierCache(redis, maxsize=100, local_ttl=30, channel='cache.invalidate', logger=logging.getLogger('test'))
+
+
+def make_handler(cache):
+    app = SimpleNamespace(cache=cache, config={'SUBSCRIPTION_EVENTS_CHANNEL': CHANNEL}, logger=logging.getLogger('test'))
+    register_subscription_events(app)
+    return cache._handlers[CHANNEL]
+
+
+def event_message(user_ids, event_id='event-1'):
+    payload = {'event': SUBSCRIPTION_CHANGED, 'user_ids': user_ids}
+    if event_id is not None:
+        payload['id'] = event_id
+    return {'type': 'message', 'channel': CHANNEL, 'data': json.dumps(payload)}
+
+
+class CacheRecommendationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.cache = make_cache(self.server)
+        self.redis = self.cache.redis
+
+    def test_stores_when_generation_is_unchanged(self):
+        generations = read_generations(self.redis, [1, 2])
+
+        stored = cache_recommendations(self.cache, {1: [{'id': 10}], 2: [{'id': 20}]}, generations, TTL)
+
+        self.assertEqual(sorted(stored), [1, 2])
+        self.assertEqual(json.loads(self.redis.get(recommendation_cache_key(1))), [{'id': 10}])
+        self.assertLessEqual(self.redis.ttl(recommendation_cache_key(1)), TTL)
+
+    def test_skips_users_whose_generation_changed_after_read(self):
+        generations = read_generations(self.redis, [1, 2])
+        # 추천을 계산하는 동안 사용자 1의 구독이 바뀌었다
+        self.redis.incr(recommendation_generation_key(1))
+
+        stored = cache_recommendations(self.cache, {1: [{'id': 10}], 2: [{'id': 20}]}, generations, TTL)
+
+        self.assertEqual(stored, [2])
+        self.assertIsNone(self.redis.get(recommendation_cache_key(1)))
+        self.assertIsNotNone(self.redis.get(recommendation_cache_key(2)))
+
+    def test_watch_error_stores_nothing(self):
+        other_client = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        generations = read_generations(self.redis, [1])
+        real_pipeline = self.redis.pipeline
+
+        def racing_pipeline(*args, **kwargs):
+            # 세대 값을 비교한 직후, MULTI/EXEC 전에 다른 프로세스가 세대 값을 올린다
+            pipe = real_pipeline(*args, **kwargs)
+            real_mget = pipe.mget
+
+            def mget(keys):
+                values = real_mget(keys)
+                other_client.incr(keys[0])
+                return values
+
+            pipe.mget = mget
+            return pipe
+
+        self.redis.pipeline = racing_pipeline
+
+        self.assertEqual(cache_recommendations(self.cache, {1: [{'id': 10}]}, generations, TTL), [])
+        self.assertIsNone(other_client.get(recommendation_cache_key(1)))
+
+
+class SubscriptionEventTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.caches = [make_cache(self.server), make_cache(self.server)]
+        self.handlers = [make_handler(cache) for cache in self.caches]
+        self.redis = self.caches[0].redis
+
+    def test_only_one_process_claims_an_event(self):
+        key = recommendation_cache_key(1)
+        self.redis.set(key, json.dumps([{'id': 10}]))
+        for cache in self.caches:
+            cache.local.set(key, [{'id': 10}])
+
+        message = event_message([1])
+        for handler in self.handlers:
+            handler(message)
+
+        # 세대 값은 한 번만 오르고, 1차 캐시는 두 프로세스 모두에서 지워진다
+        self.assertEqual(self.redis.get(recommendation_generation_key(1)), '1')
+        self.assertIsNone(self.redis.get(key))
+        for cache in self.caches:
+            self.assertIsNone(cache.local.get(key))
+
+    def test_distinct_events_each_bump_the_generation(self):
+        self.handlers[0](event_message([1], event_id='event-1'))
+        self.handlers[1](event_message([1], event_id='event-2'))
+
+        self.assertEqual(self.redis.get(recommendation_generation_key(1)), '2')
+
+    def test_event_invalidates_recommendation_computed_before_it(self):
+        generations = read_generations(self.redis, [1])
+        self.handlers[0](event_message([1]))
+
+        self.assertEqual(cache_recommendations(self.caches[0], {1: [{'id': 10}]}, generations, TTL), [])
+        self.assertIsNone(self.redis.get(recommendation_cache_key(1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+SubsClient 서킷 브레이커 단위 테스트 (네트워크 없이 세션을 대체하여 실행).
+
+실행: cd sm-reco && python -m unittest discover -s test -p 'test_*.py'
+"""
+import unittest
+from unittest import mock
+
+import requests
+
+from app.subs_client import CircuitBreaker, CircuitOpenError, SubsClient
+
+
+def make_client(max_retries=0, failure_threshold=1, reset_timeout=0):
+    client = SubsClient(
+        base_url='http://sm-subs',
+        pool_size=1,
+        connect_timeout=1,
+        read_timeout=1,
+        max_retries=max_retries,
+        backoff_base=0,
+        backoff_max=0,
+        breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout),
+    )
+    client.session = mock.Mock()
+    return client
+
+
+def response(status_code):
+    return mock.Mock(status_code=status_code)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_opens_after_threshold_and_blocks_calls(self):
+        client = make_client(failure_threshold=2, reset_timeout=60)
+        client.session.request.side_effect = requests.exceptions.ConnectionError()
+
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.get('/sub/plans')
+
+        self.assertTrue(client.breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            client.get('/sub/plans')
+        self.assertEqual(client.session.request.call_count, 2)
+
+    def test_half_open_trial_success_closes_circuit(self):
+        client = make_client()
+        client.session.request.side_effect = [requests.exceptions.Timeout(), response(200)]
+
+        with self.assertRaises(requests.exceptions.Timeout):
+            client.get('/sub/plans')
+        self.assertTrue(client.breaker.is_open)
+
+        self.assertEqual(client.get('/sub/plans').status_code, 200)
+        self.assertFalse(client.breaker.is_open)
+
+    def test_half_open_trial_with_other_request_error_settles_breaker(self):
+        # 연결 오류/타임아웃 이외의 예외로 시험 호출이 끝나도 다음 시험 호출이 허용되어야 한다
+        client = make_client()
+        client.session.request.side_effect = [
+            requests.exceptions.ConnectionError(),
+            requests.exceptions.ChunkedEncodingError(),
+            ValueError('unexpected'),
+            response(200),
+        ]
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get('/sub/plans')
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            client.get('/sub/plans')
+        self.assertTrue(client.breaker.is_open)
+        with self.assertRaises(ValueError):
+            client.get('/sub/plans')
+
+        self.assertEqual(client.get('/sub/plans').status_code, 200)
+        self.assertFalse(client.breaker.is_open)
+
+    def test_half_open_trial_blocks_concurrent_calls(self):
+        client = make_client()
+        client.session.request.side_effect = requests.exceptions.ConnectionError()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get('/sub/plans')
+
+        # 시험 호출이 진행 중이면 다른 호출은 차단된다
+        self.assertTrue(client.breaker.allow_request())
+        self.assertFalse(client.breaker.allow_request())
+        client.breaker.record_failure()
+        self.assertTrue(client.breaker.allow_request())
+
+    def test_non_retryable_error_is_not_retried(self):
+        client = make_client(max_retries=2, failure_threshold=5)
+        client.session.request.side_effect = requests.exceptions.TooManyRedirects()
+
+        with self.assertRaises(requests.exceptions.TooManyRedirects):
+            client.get('/sub/plans')
+        self.assertEqual(client.session.request.call_count, 1)
+
+    def test_retries_server_errors_then_returns_last_response(self):
+        client = make_client(max_retries=2, failure_threshold=1, reset_timeout=60)
+        client.session.request.side_effect = [response(503), requests.exceptions.Timeout(), response(502)]
+
+        self.assertEqual(client.get('/sub/plans').status_code, 502)
+        self.assertEqual(client.session.request.call_count, 3)
+        self.assertTrue(client.breaker.is_open)
+
+
+if __name__ == '__main__':
+    unittest.main()
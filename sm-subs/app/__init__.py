@@ -1,21 +1,45 @@
-import logging
 import os
 
 from flask import Flask
+from flask_caching import Cache
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from redis import Redis
 
 from .config import Config
+from .db_routing import RoutingSession
+from .health import ReadinessChecker
+from .logs import init_logging
+from .metrics import init_metrics, reset_pool_totals
+from .revocation import register_revocation
+from .serialization import FragmentCache
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
+cache = Cache()
+migrate = Migrate()
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    # Logger 설정: 큐에 넣기만 하고 JSON 포맷팅/쓰기는 리스너 스레드에서 처리, 요청 ID 전파
+    init_logging(app)
+
+    app.redis = Redis(
+        host=app.config['REDIS_HOST'],
+        port=app.config['REDIS_PORT'],
+        db=app.config['REDIS_DB'],
+        password=app.config['REDIS_PASSWORD'],
+        decode_responses=True
+    )
+
+    # 행 단위 JSON 직렬화 캐시
+    app.json_fragments = FragmentCache(app.config['SERIALIZATION_CACHE_SIZE'])
+
     # CORS 허용 도메인을 환경 변수에서 가져오기
     allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173').split(',')
 
@@ -23,23 +47,51 @@ def create_app():
     CORS(app, resources={r"/*": {"origins": allowed_origins}}, supports_credentials=True)
 
     db.init_app(app)
+    # 요청 지연 시간, 요청당 SQL 실행, 연결 풀 지표 (/metrics)
+    init_metrics(app, db)
     jwt.init_app(app)
+    # 비활성 사용자(sm-user 발행)의 토큰은 JWT 검사 단계에서 거절
+    register_revocation(app, jwt)
+    cache.init_app(app)
+    migrate.init_app(app, db)
 
-    # Logger 설정
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    app.logger.addHandler(handler)
+    # 사용자별 최근 쓰기 기록 (읽기 복제본 라우팅의 읽기-쓰기 일관성)
+    from app.db_routing import register_read_your_writes
+    register_read_your_writes()
 
-    # 로깅 레벨 설정
-    app.logger.setLevel(logging.INFO)
-    app.logger.info("Flask application started")
+    # 플랜/제공업체 변경 시 카탈로그 버전을 올리는 세션 이벤트 등록
+    from app.catalog import register_catalog_events
+    register_catalog_events()
+
+    # 구독 변경 시 사용자 ID를 pub/sub로 발행 (sm-reco 추천 캐시 무효화)
+    from app.events import register_subscription_events
+    register_subscription_events()
+
+    # 배치 작업용 CLI 명령 (flask renew-subscriptions 등)
+    from app.commands import register_commands
+    register_commands(app)
+
+    # /health/ready 의존성 점검 (제한 시간 + 짧은 결과 캐시)
+    app.readiness = ReadinessChecker.from_app(app, db)
 
     from app.routes import bp as api_bp
     CORS(api_bp)
     app.register_blueprint(api_bp)
 
+    app.logger.info("Flask application started")
     return app
+
+
+def reinit_after_fork(app):
+    """
+    마스터에서 만든 앱을 fork한 워커에서 호출한다. 부모와 공유하는 DB/Redis 연결을 버리고 워커에서 새로 연다.
+    스레드는 fork 후 남지 않으므로 비활성 사용자 리스너를 다시 시작한다.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    reset_pool_totals()
+    app.log_pipeline.reinit_after_fork()
+    app.redis.connection_pool.reset()
+    app.deactivated_users.start_listener()
+    app.readiness = ReadinessChecker.from_app(app, db)
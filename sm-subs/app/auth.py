@@ -0,0 +1,46 @@
+import hmac
+from functools import wraps
+from http import HTTPStatus
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import verify_jwt_in_request
+
+INTERNAL_TOKEN_HEADER = 'X-Internal-Token'
+
+
+def is_internal_request():
+    """
+    X-Internal-Token 헤더가 INTERNAL_API_TOKEN 설정값과 일치하면 True.
+    """
+    expected = current_app.config['INTERNAL_API_TOKEN']
+    provided = request.headers.get(INTERNAL_TOKEN_HEADER, '')
+    return bool(expected) and hmac.compare_digest(provided, expected)
+
+
+def internal_api_required(fn):
+    """
+    내부 서비스 호출 전용 엔드포인트에 사용하는 데코레이터.
+    X-Internal-Token 헤더가 INTERNAL_API_TOKEN 설정값과 일치해야 한다.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_internal_request():
+            current_app.logger.warning('Rejected internal API call to %s', request.path)
+            return jsonify({'error': 'Access denied.'}), HTTPStatus.FORBIDDEN
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def jwt_or_internal_api_required(fn):
+    """
+    사용자 JWT 또는 X-Internal-Token 중 하나로 호출할 수 있는 엔드포인트에 사용하는 데코레이터.
+    사용자와 무관한 조회(플랜 카탈로그)를 다른 서비스가 JWT 없이 호출할 때 사용한다.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_internal_request():
+            verify_jwt_in_request()
+        return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,159 @@
+"""
+구독 갱신(정기 결제)과 만료 처리.
+
+결제일이 된 자동 갱신 구독을 배치 단위로 SELECT ... FOR UPDATE SKIP LOCKED로 잠그고,
+next_billing_date를 billing_cycle_months만큼 뒤로 옮긴 뒤 결제 행을 일괄 INSERT한다.
+배치마다 커밋하므로 잠금은 짧게 유지되고, 여러 워커를 동시에 실행해도
+서로 잠근 행을 건너뛰어 같은 구독을 두 번 갱신하지 않는다.
+
+자동 갱신이 꺼진 채 결제일이 지난 구독은 집합 단위 UPDATE로 배치마다 expired로 바꾼다.
+"""
+from datetime import date, datetime, timezone
+
+from dateutil.relativedelta import relativedelta
+from flask import current_app
+from sqlalchemy import func, insert, select, update
+
+from app import db
+from app.events import publish_subscription_changes
+from app.models import SubscriptionPayment, SubscriptionPlan, UserSubscription
+
+
+def next_billing_date_after(start_date, billing_date, cycle_months):
+    """
+    billing_date에서 정확히 한 주기(cycle_months) 뒤의 결제일.
+    월말 시작 구독의 결제일이 짧은 달의 말일로 당겨져 있으면 start_date의 일자로 되돌려,
+    짧은 달을 거치며 결제일이 계속 당겨지지 않게 한다. 연장(+30일)으로 옮겨진 결제일은 그 일자를 유지한다.
+    """
+    next_date = billing_date + relativedelta(months=cycle_months)
+    clamped_to_month_end = billing_date == billing_date + relativedelta(day=31)
+    if clamped_to_month_end and billing_date.day < start_date.day:
+        # relativedelta(day=n)은 그 달에 없는 일자면 말일로 맞춘다
+        next_date += relativedelta(day=start_date.day)
+    return next_date
+
+
+def due_subscriptions_query(as_of, batch_size):
+    """
+    결제일이 된 자동 갱신 구독을 결제일 순으로 batch_size개 잠그는 쿼리. 다른 워커가 잠근 행은 건너뛴다.
+    """
+    return (
+        db.session.query(
+            UserSubscription.id,
+            UserSubscription.start_date,
+            UserSubscription.next_billing_date,
+            UserSubscription.payment_method,
+            SubscriptionPlan.monthly_fee,
+            SubscriptionPlan.billing_cycle_months
+        )
+        .join(SubscriptionPlan, UserSubscription.subscription_plan_id == SubscriptionPlan.id)
+        .filter(UserSubscription.status == 'active')
+        .filter(UserSubscription.auto_renewal.is_(True))
+        .filter(UserSubscription.next_billing_date <= as_of)
+        .order_by(UserSubscription.next_billing_date.asc(), UserSubscription.id.asc())
+        .limit(batch_size)
+        .with_for_update(of=UserSubscription, skip_locked=True)
+    )
+
+
+def renew_due_subscriptions(as_of=None, batch_size=None, max_batches=None):
+    """
+    as_of(기본: 오늘)까지 결제일이 된 자동 갱신 구독을 갱신하고 갱신한 건수를 반환한다.
+    여러 주기가 밀린 구독은 배치마다 한 주기씩 결제되어 결제일이 as_of 이후가 될 때까지 진행된다.
+    """
+    as_of = as_of or date.today()
+    batch_size = batch_size or current_app.config['RENEWAL_BATCH_SIZE']
+    renewed = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        try:
+            due = due_subscriptions_query(as_of, batch_size).all()
+            if not due:
+                db.session.rollback()
+                break
+
+            now = datetime.now(timezone.utc)
+            subscription_updates = []
+            payments = []
+            for row in due:
+                cycle_months = row.billing_cycle_months or 1
+                subscription_updates.append({
+                    'id': row.id,
+                    'next_billing_date': next_billing_date_after(
+                        row.start_date, row.next_billing_date, cycle_months
+                    ),
+                    'updated_at': now,
+                })
+                payments.append({
+                    'user_subscription_id': row.id,
+                    'amount_paid': row.monthly_fee * cycle_months,
+                    'payment_date': now,
+                    'payment_status': 'successful',
+                    'payment_method': row.payment_method,
+                })
+
+            # 기본 키 기준 일괄 UPDATE와 결제 행 일괄 INSERT
+            db.session.execute(update(UserSubscription), subscription_updates)
+            db.session.execute(insert(SubscriptionPayment), payments)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        renewed += len(due)
+        batches += 1
+        current_app.logger.info('Renewed %s subscriptions (total %s) due by %s', len(due), renewed, as_of)
+
+    return renewed
+
+
+def lapsed_ids_select(as_of, batch_size):
+    """
+    자동 갱신이 꺼진 채 결제일이 지난 활성 구독 ID를 batch_size개 잠그는 SELECT.
+    """
+    return (
+        select(UserSubscription.id)
+        .where(UserSubscription.status == 'active')
+        .where(UserSubscription.auto_renewal.is_(False))
+        .where(UserSubscription.next_billing_date < as_of)
+        .order_by(UserSubscription.next_billing_date, UserSubscription.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def expire_lapsed_subscriptions(as_of=None, batch_size=None, max_batches=None):
+    """
+    자동 갱신이 꺼져 있고 결제일이 as_of(기본: 오늘) 이전인 활성 구독을 expired로 바꾸고 바꾼 건수를 반환한다.
+    일괄 UPDATE는 세션 이벤트를 거치지 않으므로 배치마다 구독 변경 이벤트를 직접 발행한다.
+    """
+    as_of = as_of or date.today()
+    batch_size = batch_size or current_app.config['EXPIRY_BATCH_SIZE']
+    expired = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        statement = (
+            update(UserSubscription)
+            .where(UserSubscription.id.in_(lapsed_ids_select(as_of, batch_size).scalar_subquery()))
+            .values(status='expired', updated_at=func.now())
+            .returning(UserSubscription.id, UserSubscription.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            rows = db.session.execute(statement).all()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if not rows:
+            break
+
+        expired += len(rows)
+        batches += 1
+        publish_subscription_changes(row.user_id for row in rows)
+        current_app.logger.info('Expired %s lapsed subscriptions (total %s) as of %s', len(rows), expired, as_of)
+
+    return expired
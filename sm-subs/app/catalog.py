@@ -0,0 +1,143 @@
+"""
+구독 플랜 카탈로그 캐시.
+
+카탈로그(활성 플랜 + 제공업체 이름)는 거의 바뀌지 않으므로 직렬화된 응답 본문을
+Redis의 버전 키 아래에 저장하고, 각 프로세스는 같은 버전의 본문을 Flask-Caching
+메모리 캐시에 한 번 더 보관한다. 플랜이나 제공업체 행이 커밋되면 버전을 올려서
+모든 워커의 캐시가 다음 요청에서 자연스럽게 무효화되도록 한다.
+"""
+import hashlib
+
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from app import cache, db
+from app.db_routing import primary_reads
+from app.metrics import record_cache
+from app.models import SubscriptionPlan, SubscriptionProvider
+from app.serialization import json_array, plan_fragment
+
+VERSION_KEY = 'catalog:plans:version'
+PAYLOAD_KEY = 'catalog:plans:{version}'
+LOCAL_KEY = 'catalog:plans'
+
+_CATALOG_MODELS = (SubscriptionPlan, SubscriptionProvider)
+
+
+def build_catalog_body():
+    """
+    DB에서 활성 플랜을 조회하여 JSON 응답 본문(bytes)을 만든다.
+    """
+    # 결과가 버전 키로 오래 캐시되므로 복제 지연된 목록이 새 버전으로 저장되지 않도록 primary에서 읽는다
+    with primary_reads():
+        plans = (
+            SubscriptionPlan.query
+            .filter_by(is_active=True)
+            .options(joinedload(SubscriptionPlan.provider))
+            .order_by(SubscriptionPlan.id.asc())
+            .all()
+        )
+    return json_array(plan_fragment(plan) for plan in plans)
+
+
+def make_etag(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+def current_version():
+    """
+    Redis에 저장된 카탈로그 버전을 반환한다. Redis에 접근할 수 없으면 None.
+    """
+    try:
+        version = current_app.redis.get(VERSION_KEY)
+    except RedisError as e:
+        current_app.logger.warning('Catalog version lookup failed: %s', e)
+        return None
+    return int(version) if version else 0
+
+
+def get_catalog():
+    """
+    (본문, ETag) 튜플을 반환한다.
+
+    조회 순서: 프로세스 메모리 → Redis(버전 키) → DB.
+    버전은 DB 조회 전에 읽어 두므로, 조회 도중 커밋된 변경은 다음 버전에서 반영된다.
+    """
+    version = current_version()
+    if version is None:
+        body = build_catalog_body()
+        return body, make_etag(body)
+
+    local = cache.get(LOCAL_KEY)
+    if local and local[0] == version:
+        record_cache('catalog_local', True)
+        return local[1], local[2]
+    record_cache('catalog_local', False)
+
+    ttl = current_app.config['CATALOG_CACHE_TTL_SECOND']
+    payload_key = PAYLOAD_KEY.format(version=version)
+    try:
+        body = current_app.redis.get(payload_key)
+        if body is not None:
+            body = body.encode('utf-8')
+    except RedisError as e:
+        current_app.logger.warning('Catalog payload lookup failed: %s', e)
+        body = None
+    record_cache('catalog', body is not None)
+
+    if body is None:
+        body = build_catalog_body()
+        try:
+            current_app.redis.set(payload_key, body, ex=ttl)
+        except RedisError as e:
+            current_app.logger.warning('Catalog payload store failed: %s', e)
+        current_app.logger.info('Built subscription plan catalog for version %s', version)
+
+    etag = make_etag(body)
+    cache.set(LOCAL_KEY, (version, body, etag), timeout=ttl)
+    return body, etag
+
+
+def bump_version():
+    """
+    카탈로그 버전을 올려 모든 프로세스의 캐시를 무효화한다.
+    """
+    cache.delete(LOCAL_KEY)
+    try:
+        version = current_app.redis.incr(VERSION_KEY)
+    except RedisError as e:
+        current_app.logger.error('Catalog version bump failed: %s', e)
+        return None
+    current_app.logger.info('Subscription plan catalog version bumped to %s', version)
+    return version
+
+
+def _track_catalog_changes(session, flush_context, instances):
+    changed = (session.new | session.dirty | session.deleted)
+    if any(isinstance(obj, _CATALOG_MODELS) for obj in changed):
+        session.info['catalog_dirty'] = True
+
+
+def _bump_after_commit(session):
+    if session.info.pop('catalog_dirty', False):
+        bump_version()
+
+
+def _reset_after_rollback(session):
+    session.info.pop('catalog_dirty', None)
+
+
+def register_catalog_events():
+    """
+    플랜/제공업체 행이 변경된 트랜잭션이 커밋되면 카탈로그 버전을 올린다.
+    """
+    listeners = (
+        ('before_flush', _track_catalog_changes),
+        ('after_commit', _bump_after_commit),
+        ('after_rollback', _reset_after_rollback),
+    )
+    for name, fn in listeners:
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
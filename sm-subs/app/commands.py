@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import click
+
+from app.billing import expire_lapsed_subscriptions, renew_due_subscriptions
+from app.query_plans import check_query_plans
+
+
+def register_commands(app):
+    @app.cli.command('renew-subscriptions')
+    @click.option('--as-of', default=None, help='Renew subscriptions due on or before this date (YYYY-MM-DD). Defaults to today.')
+    @click.option('--batch-size', default=None, type=int, help='Subscriptions locked and renewed per transaction.')
+    @click.option('--max-batches', default=None, type=int, help='Stop after this many batches.')
+    def renew_subscriptions_command(as_of, batch_size, max_batches):
+        """
+        결제일이 된 자동 갱신 구독을 갱신한다. 여러 프로세스에서 동시에 실행해도 안전하다.
+        """
+        as_of_date = datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else None
+        renewed = renew_due_subscriptions(as_of=as_of_date, batch_size=batch_size, max_batches=max_batches)
+        click.echo(f'Renewed {renewed} subscriptions.')
+
+    @app.cli.command('expire-subscriptions')
+    @click.option('--as-of', default=None, help='Expire subscriptions whose billing date is before this date (YYYY-MM-DD). Defaults to today.')
+    @click.option('--batch-size', default=None, type=int, help='Subscriptions expired per UPDATE statement.')
+    @click.option('--max-batches', default=None, type=int, help='Stop after this many batches.')
+    def expire_subscriptions_command(as_of, batch_size, max_batches):
+        """
+        자동 갱신이 꺼진 채 결제일이 지난 활성 구독을 expired로 바꾼다.
+        """
+        as_of_date = datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else None
+        expired = expire_lapsed_subscriptions(as_of=as_of_date, batch_size=batch_size, max_batches=max_batches)
+        click.echo(f'Expired {expired} subscriptions.')
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """
+        핫 쿼리가 인덱스를 사용하는지 EXPLAIN으로 확인하고, 순차 스캔이 있으면 종료 코드 1로 실패한다.
+        """
+        failed = False
+        for name, seq_scans in check_query_plans():
+            if seq_scans:
+                failed = True
+                click.echo(f'FAIL  {name}: Seq Scan on {", ".join(seq_scans)}')
+            else:
+                click.echo(f'OK    {name}')
+        if failed:
+            raise SystemExit(1)
@@ -1,5 +1,19 @@
 import os
 
+from .db_pool import TimedQueuePool
+
+
+def replica_binds(hosts, user, password, default_port, name):
+    """
+    쉼표로 구분한 복제본 host[:port] 목록으로 SQLALCHEMY_BINDS(replica_0, replica_1, ...)를 만든다.
+    """
+    binds = {}
+    for index, host in enumerate(h.strip() for h in hosts.split(',') if h.strip()):
+        if ':' not in host:
+            host = f'{host}:{default_port}'
+        binds[f'replica_{index}'] = f'postgresql://{user}:{password}@{host}/{name}'
+    return binds
+
 
 class Config:
     # Construct database URI from individual components
@@ -12,4 +26,82 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # DB 연결 풀과 서버 측 타임아웃 (모든 바인드에 적용)
+    # 워커 프로세스당 최대 연결 수는 DB_POOL_SIZE + DB_MAX_OVERFLOW (바인드마다)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT_SECOND = int(os.getenv('DB_POOL_TIMEOUT_SECOND', '30'))
+    DB_POOL_RECYCLE_SECOND = int(os.getenv('DB_POOL_RECYCLE_SECOND', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', '60000'))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': TimedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT_SECOND,
+        'pool_recycle': DB_POOL_RECYCLE_SECOND,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        'connect_args': {
+            'options': (
+                f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} '
+                f'-c idle_in_transaction_session_timeout={DB_IDLE_IN_TRANSACTION_TIMEOUT_MS}'
+            ),
+        },
+    }
+
+    # 읽기 복제본 (쉼표로 구분한 host[:port], 비어 있으면 모든 쿼리가 위 DB로 간다)
+    # GET 요청의 읽기만 복제본으로 보내며, 사용자가 쓴 뒤 READ_YOUR_WRITES_SECOND 동안은 그 사용자의 읽기도 위 DB로 보낸다
+    DB_REPLICA_HOSTS = os.getenv('DB_REPLICA_HOSTS', '')
+    SQLALCHEMY_BINDS = replica_binds(DB_REPLICA_HOSTS, DB_USER, DB_PASSWORD, DB_PORT, DB_NAME)
+    READ_YOUR_WRITES_SECOND = int(os.getenv('READ_YOUR_WRITES_SECOND', '5'))
+
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'mJMLk2qwEFKp1Lx2FatzwVOA6-3FjMqkLEAWu74uCU9')
+
+    REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+    REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+    REDIS_DB = int(os.getenv('REDIS_DB', 0))
+    REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', 'redispassword')
+
+    # Flask-Caching: 프로세스 메모리 캐시 (카탈로그 1차 캐시)
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', '300'))
+
+    # 구독 플랜 카탈로그 캐시 (버전 키가 바뀌기 전까지 유효)
+    CATALOG_CACHE_TTL_SECOND = int(os.getenv('CATALOG_CACHE_TTL_SECOND', '3600'))
+
+    # 구독 변경 이벤트 pub/sub 채널 (sm-reco가 구독)
+    SUBSCRIPTION_EVENTS_CHANNEL = os.getenv('SUBSCRIPTION_EVENTS_CHANNEL', 'subscription.events')
+
+    # sm-user가 관리하는 비활성 사용자 집합 (JWT 검사에서 토큰 거절)
+    DEACTIVATED_USERS_KEY = os.getenv('DEACTIVATED_USERS_KEY', 'users:deactivated')
+    USER_STATUS_CHANNEL = os.getenv('USER_STATUS_CHANNEL', 'user.status')
+    DEACTIVATED_USERS_REFRESH_SECOND = int(os.getenv('DEACTIVATED_USERS_REFRESH_SECOND', '60'))
+
+    # 행 단위 JSON 직렬화 캐시 최대 항목 수
+    SERIALIZATION_CACHE_SIZE = int(os.getenv('SERIALIZATION_CACHE_SIZE', '10000'))
+
+    # 내부 서비스 간 호출 인증 토큰 (비어 있으면 내부 API 비활성화)
+    INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+    BULK_MAX_USER_IDS = int(os.getenv('BULK_MAX_USER_IDS', '1000'))
+
+    # 결제 내역 커서 모드 페이지 크기 상한
+    PAYMENTS_MAX_PER_PAGE = int(os.getenv('PAYMENTS_MAX_PER_PAGE', '100'))
+    # 결제 내역 내보내기 시 서버 측 커서에서 한 번에 읽는 행 수
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+    # 구독 갱신 워커가 한 트랜잭션에서 잠그고 처리하는 구독 수
+    RENEWAL_BATCH_SIZE = int(os.getenv('RENEWAL_BATCH_SIZE', '1000'))
+
+    # 만료 처리 작업이 UPDATE 한 번에 바꾸는 구독 수
+    EXPIRY_BATCH_SIZE = int(os.getenv('EXPIRY_BATCH_SIZE', '1000'))
+
+    # 로깅: 큐 기반 JSON 로그. 큐가 가득 차면 로그를 버린다
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # 호출이 많은 엔드포인트 로거의 INFO 로그 샘플링 비율 ('로거=비율,...'), WARNING 이상은 모두 남긴다
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', 'app.routes.plans=0.1')
+
+    # /health/ready 의존성 점검 제한 시간과 결과 재사용 시간
+    READINESS_TIMEOUT_SECOND = float(os.getenv('READINESS_TIMEOUT_SECOND', '1'))
+    READINESS_CACHE_SECOND = float(os.getenv('READINESS_CACHE_SECOND', '2'))
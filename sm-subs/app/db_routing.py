@@ -0,0 +1,119 @@
+"""
+읽기 복제본 라우팅.
+
+GET/HEAD 요청의 쿼리는 SQLALCHEMY_BINDS에 등록된 replica_* 엔진 중 하나로 보내고,
+그 밖의 요청, flush, 요청 밖(CLI, 배치 작업)의 쿼리는 기본(primary) 엔진으로 보낸다.
+복제본은 요청마다 무작위로 하나를 골라 요청이 끝날 때까지 유지한다.
+
+읽기-쓰기 일관성: 사용자의 쓰기가 커밋되면 Redis에 짧은 TTL의 표시를 남기고,
+표시가 남아 있는 동안 그 사용자의 읽기는 primary로 보내 복제 지연으로 방금 쓴 값이 안 보이는 일을 막는다.
+"""
+import random
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from redis.exceptions import RedisError
+from sqlalchemy import event
+
+REPLICA_BIND_PREFIX = 'replica_'
+READ_METHODS = ('GET', 'HEAD')
+RECENT_WRITE_KEY = 'db:recent_write:{user_id}'
+
+
+def _current_user_id():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # JWT를 검증하지 않은 요청 (공개 엔드포인트)
+        return None
+
+
+def _has_recent_write(user_id):
+    try:
+        return bool(current_app.redis.exists(RECENT_WRITE_KEY.format(user_id=user_id)))
+    except RedisError as e:
+        current_app.logger.warning('Recent write lookup failed; reading from primary: %s', e)
+        return True
+
+
+def _choose_replica(engines):
+    replicas = [key for key in engines if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)]
+    if not replicas or request.method not in READ_METHODS:
+        return None
+    user_id = _current_user_id()
+    if user_id is not None and _has_recent_write(user_id):
+        return None
+    return random.choice(replicas)
+
+
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not self.info.get('has_writes') and has_request_context():
+            if '_db_replica' not in g:
+                g._db_replica = _choose_replica(self._db.engines)
+            if g._db_replica is not None:
+                return self._db.engines[g._db_replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def primary_reads():
+    """
+    블록 안의 쿼리를 복제본 대신 primary로 보낸다. 결과를 캐시에 오래 보관하는 조회처럼
+    복제 지연이 그대로 굳어지면 안 되는 경우에 사용한다.
+    """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get('_db_replica')
+    had_previous = '_db_replica' in g
+    g._db_replica = None
+    try:
+        yield
+    finally:
+        if had_previous:
+            g._db_replica = previous
+        else:
+            g.pop('_db_replica', None)
+
+
+def _track_writes(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        session.info['has_writes'] = True
+
+
+def _mark_recent_write(session):
+    if not session.info.pop('has_writes', False) or not has_request_context():
+        return
+    user_id = _current_user_id()
+    if user_id is None:
+        return
+    try:
+        current_app.redis.setex(
+            RECENT_WRITE_KEY.format(user_id=user_id),
+            current_app.config['READ_YOUR_WRITES_SECOND'],
+            1
+        )
+    except RedisError as e:
+        current_app.logger.warning('Failed to record recent write for user %s: %s', user_id, e)
+
+
+def _reset_after_rollback(session):
+    session.info.pop('has_writes', None)
+
+
+def register_read_your_writes():
+    """
+    커밋된 쓰기를 사용자별로 기록하는 세션 이벤트를 등록한다.
+    """
+    listeners = (
+        ('before_flush', _track_writes),
+        ('after_commit', _mark_recent_write),
+        ('after_rollback', _reset_after_rollback),
+    )
+    for name, fn in listeners:
+        if not event.contains(RoutingSession, name, fn):
+            event.listen(RoutingSession, name, fn)
@@ -0,0 +1,73 @@
+"""
+구독 변경 이벤트 발행.
+
+UserSubscription 행의 생성/삭제 또는 상태·플랜 변경이 커밋되면 영향을 받은 사용자 ID를
+Redis pub/sub 채널로 발행한다. sm-reco는 이 이벤트를 받아 해당 사용자의 추천 캐시만 비운다.
+"""
+import json
+import uuid
+
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+
+from app import db
+from app.models import UserSubscription
+
+SUBSCRIPTION_CHANGED = 'subscription.changed'
+
+_TRACKED_ATTRIBUTES = ('status', 'subscription_plan_id', 'user_id')
+
+
+def publish_subscription_changes(user_ids):
+    """
+    구독이 바뀐 사용자 ID 목록을 발행한다. 일괄 UPDATE처럼 세션 이벤트를 거치지 않는 경로에서도 사용한다.
+    """
+    user_ids = sorted({int(user_id) for user_id in user_ids})
+    if not user_ids:
+        return
+    # 구독자가 같은 이벤트를 한 번만 처리할 수 있도록 이벤트 ID를 함께 보낸다
+    payload = json.dumps({'id': uuid.uuid4().hex, 'event': SUBSCRIPTION_CHANGED, 'user_ids': user_ids})
+    try:
+        current_app.redis.publish(current_app.config['SUBSCRIPTION_EVENTS_CHANNEL'], payload)
+    except RedisError as e:
+        current_app.logger.error('Failed to publish subscription changes for users %s: %s', user_ids, e)
+
+
+def _is_relevant_change(subscription):
+    state = inspect(subscription)
+    return any(state.attrs[name].history.has_changes() for name in _TRACKED_ATTRIBUTES)
+
+
+def _track_subscription_changes(session, flush_context, instances):
+    changed_user_ids = session.info.setdefault('changed_user_ids', set())
+    for obj in session.new | session.deleted:
+        if isinstance(obj, UserSubscription):
+            changed_user_ids.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, UserSubscription) and _is_relevant_change(obj):
+            changed_user_ids.add(obj.user_id)
+
+
+def _publish_after_commit(session):
+    changed_user_ids = session.info.pop('changed_user_ids', None)
+    if changed_user_ids:
+        publish_subscription_changes(changed_user_ids)
+
+
+def _reset_after_rollback(session):
+    session.info.pop('changed_user_ids', None)
+
+
+def register_subscription_events():
+    """
+    구독 변경이 커밋되면 사용자 ID를 발행하는 세션 이벤트를 등록한다.
+    """
+    listeners = (
+        ('before_flush', _track_subscription_changes),
+        ('after_commit', _publish_after_commit),
+        ('after_rollback', _reset_after_rollback),
+    )
+    for name, fn in listeners:
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,192 @@
+"""
+비동기 JSON 로깅과 요청 ID.
+
+요청 스레드는 로그 레코드를 크기가 제한된 큐에 넣기만 하고, 메시지 포맷팅(%s 인자 병합)과
+JSON 인코딩, stderr 쓰기는 QueueListener 스레드가 처리한다. 큐가 가득 차면 요청을 막지 않고 버린다.
+
+요청마다 X-Request-ID 헤더(없으면 새로 생성)를 요청 ID로 사용해 모든 로그 줄에 남기고,
+응답 헤더와 sm-subs 호출 헤더로 전달해 한 요청이 여러 서비스에 남긴 로그를 이어 볼 수 있게 한다.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+_request_id = ContextVar('request_id', default=None)
+
+
+def current_request_id():
+    """
+    현재 컨텍스트의 요청 ID. 요청 밖(배치 작업, 리스너 스레드)에서는 None.
+    """
+    return _request_id.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    로그를 남긴 스레드의 요청 ID를 레코드에 붙인다. 큐에 넣기 전에 실행되어야 한다.
+    """
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    INFO 이하 레코드를 rate 비율로만 통과시킨다. WARNING 이상은 항상 남긴다.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'thread': record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    큐가 가득 차면 기다리지 않고 레코드를 버리고 dropped만 센다.
+    on_drop이 있으면 버릴 때마다 호출한다 (metrics.py가 log_records_dropped_total 카운터를 연결한다).
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.on_drop = None
+        self._lock = threading.Lock()
+
+    def prepare(self, record):
+        # 기본 구현은 호출 스레드에서 메시지를 포맷팅하므로, 예외 스택만 미리 문자열로 만들고
+        # 메시지와 인자는 그대로 넘겨 리스너 스레드에서 포맷팅한다
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop()
+
+
+class LogPipeline:
+    """
+    앱 로거에 연결된 큐 핸들러와 stderr로 쓰는 리스너 스레드.
+    """
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.handler.addFilter(RequestIdFilter())
+        self.stream_handler = logging.StreamHandler(sys.stderr)
+        self.stream_handler.setFormatter(JsonFormatter())
+        self.listener = None
+
+    def start(self):
+        """
+        리스너 스레드를 시작한다.
+        """
+        self.listener = QueueListener(self.queue, self.stream_handler, respect_handler_level=True)
+        self.listener.start()
+
+    def reinit_after_fork(self):
+        """
+        fork 시점에 부모의 리스너가 큐 잠금을 잡고 있었을 수 있으므로 큐를 새로 만들고 리스너를 다시 시작한다.
+        """
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.handler.queue = self.queue
+        self.start()
+
+    def stop(self):
+        # 큐에 남은 레코드를 모두 쓰고 리스너 스레드를 종료
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+
+
+def parse_sample_rates(value):
+    """
+    'app.routes.recommend=0.1,app.routes.plans=0.5' 형식을 {로거 이름: 비율}로 바꾼다.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, rate = item.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def init_logging(app):
+    """
+    앱 로거(및 하위 로거)를 큐 기반 JSON 로깅으로 설정하고 요청 ID 훅을 등록한다.
+    Flask가 먼저 붙인 기본 stderr 핸들러가 있으면 제거한다.
+    """
+    pipeline = LogPipeline(app.config['LOG_QUEUE_SIZE'])
+    logger = logging.getLogger(app.name)
+    logger.handlers.clear()
+    logger.addHandler(pipeline.handler)
+    logger.setLevel(app.config['LOG_LEVEL'])
+    # 같은 줄이 루트 로거(gunicorn 등)로 한 번 더 나가지 않도록 한다
+    logger.propagate = False
+
+    for name, rate in parse_sample_rates(app.config['LOG_SAMPLE_RATES']).items():
+        logging.getLogger(name).addFilter(SamplingFilter(rate))
+
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    app.log_pipeline = pipeline
+
+    @app.before_request
+    def bind_request_id():
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.request_id_token = _request_id.set(request_id[:128])
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = _request_id.get()
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    @app.teardown_request
+    def unbind_request_id(exc):
+        token = g.pop('request_id_token', None)
+        if token is not None:
+            _request_id.reset(token)
+
+    return pipeline
@@ -0,0 +1,195 @@
+"""
+Prometheus 지표와 /metrics 엔드포인트.
+
+- 요청 지연 시간: 라우트(url_rule)·메서드·상태 코드별 히스토그램
+- DB: 쿼리별 소요 시간과 요청당 쿼리 수/시간 (SQLAlchemy 커서 이벤트)
+- 캐시: 캐시 이름별 hit/miss 카운터 (각 캐시 조회 지점에서 record_cache로 기록)
+- DB 연결 풀: TimedQueuePool 체크아웃 지표를 요청이 끝날 때마다 반영
+- 로그: 큐가 가득 차서 버린 로그 레코드 수 (NonBlockingQueueHandler)
+
+Gunicorn 워커마다 지표가 따로 쌓이므로 PROMETHEUS_MULTIPROC_DIR이 설정되어 있으면
+모든 워커의 지표 파일을 합쳐서 내보낸다 (gunicorn.conf.py에서 설정).
+"""
+import os
+import threading
+import time
+
+from flask import g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .db_pool import TimedQueuePool
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ['method', 'endpoint', 'status'],
+)
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'Duration of a single SQL statement',
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'db_queries_per_request', 'SQL statements executed per HTTP request',
+    ['endpoint'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    'db_seconds_per_request', 'Time spent in SQL statements per HTTP request',
+    ['endpoint'],
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by result',
+    ['cache', 'result'],
+)
+LOG_RECORDS_DROPPED = Counter(
+    'log_records_dropped_total', 'Log records dropped because the log queue was full',
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Connections currently checked out',
+    ['bind'], multiprocess_mode='livesum',
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Connections opened beyond pool_size',
+    ['bind'], multiprocess_mode='livesum',
+)
+DB_POOL_CHECKOUTS = Counter(
+    'db_pool_checkouts_total', 'Connection checkouts',
+    ['bind'],
+)
+DB_POOL_TIMEOUTS = Counter(
+    'db_pool_timeouts_total', 'Checkouts that timed out waiting for a connection',
+    ['bind'],
+)
+DB_POOL_WAIT_SECONDS = Counter(
+    'db_pool_wait_seconds_total', 'Time spent waiting for a pool connection',
+    ['bind'],
+)
+
+# 카운터로 옮긴 마지막 TimedQueuePool 누적값 ((bind, 항목) -> 값)
+_pool_totals = {}
+_pool_totals_lock = threading.Lock()
+
+
+def record_cache(cache, hit):
+    """
+    캐시 조회 결과를 기록한다. hit은 True/False 또는 'stale' 같은 결과 이름.
+    """
+    if hit is True:
+        result = 'hit'
+    elif hit is False:
+        result = 'miss'
+    else:
+        result = hit
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    DB_QUERY_LATENCY.observe(elapsed)
+    if has_request_context() and 'metrics_db_queries' in g:
+        g.metrics_db_queries += 1
+        g.metrics_db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 시작 시각만 버린다
+    started = exception_context.connection.info.get('query_started') if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def register_query_events():
+    """
+    모든 엔진의 SQL 실행 시간을 기록하는 이벤트를 등록한다.
+    """
+    listeners = (
+        ('before_cursor_execute', _before_cursor_execute),
+        ('after_cursor_execute', _after_cursor_execute),
+        ('handle_error', _handle_error),
+    )
+    for name, fn in listeners:
+        if not event.contains(Engine, name, fn):
+            event.listen(Engine, name, fn)
+
+
+def _add_pool_total(bind, name, counter, value):
+    with _pool_totals_lock:
+        delta = value - _pool_totals.get((bind, name), 0)
+        _pool_totals[(bind, name)] = value
+    if delta > 0:
+        counter.labels(bind).inc(delta)
+
+
+def sync_pool_metrics(engines):
+    """
+    TimedQueuePool의 현재 상태와 누적 지표를 Prometheus 지표로 옮긴다.
+    """
+    for key, engine in engines.items():
+        pool = engine.pool
+        if not isinstance(pool, TimedQueuePool):
+            continue
+        bind = key or 'primary'
+        stats = pool.stats()
+        DB_POOL_CHECKED_OUT.labels(bind).set(stats['checked_out'])
+        DB_POOL_OVERFLOW.labels(bind).set(max(stats['overflow'], 0))
+        _add_pool_total(bind, 'checkouts', DB_POOL_CHECKOUTS, stats['checkouts'])
+        _add_pool_total(bind, 'timeouts', DB_POOL_TIMEOUTS, stats['timeouts'])
+        _add_pool_total(bind, 'wait_seconds', DB_POOL_WAIT_SECONDS, stats['wait_seconds_total'])
+
+
+def reset_pool_totals():
+    """
+    fork한 워커의 풀은 새로 시작하므로 부모에서 옮겨 둔 누적값을 비운다.
+    """
+    with _pool_totals_lock:
+        _pool_totals.clear()
+
+
+def metrics_response():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+def init_metrics(app, db):
+    """
+    요청 계측 훅, SQL 실행 이벤트와 /metrics 엔드포인트를 등록한다.
+    """
+    register_query_events()
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_queries = 0
+        g.metrics_db_seconds = 0.0
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, endpoint, response.status_code).observe(
+            time.perf_counter() - started
+        )
+        DB_QUERIES_PER_REQUEST.labels(endpoint).observe(g.pop('metrics_db_queries', 0))
+        DB_SECONDS_PER_REQUEST.labels(endpoint).observe(g.pop('metrics_db_seconds', 0.0))
+        sync_pool_metrics(db.engines)
+        return response
+
+    # init_logging이 먼저 만든 로그 큐 핸들러가 버린 레코드를 카운터로 센다
+    pipeline = getattr(app, 'log_pipeline', None)
+    if pipeline is not None:
+        pipeline.handler.on_drop = LOG_RECORDS_DROPPED.inc
+
+    app.add_url_rule('/metrics', 'metrics', metrics_response, methods=['GET'])
@@ -3,6 +3,9 @@ from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB
 from app import db
 
+# 사용자·플랜당 활성 구독 하나만 허용하는 유일 인덱스 이름 (POST /sub에서 위반 여부를 구분할 때 사용)
+ACTIVE_SUBSCRIPTION_CONSTRAINT = 'uq_user_subs_active_user_plan'
+
 
 class SubscriptionProvider(db.Model):
     __tablename__ = 'subscription_providers'
@@ -39,6 +42,9 @@ class SubscriptionProvider(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    def serialization_key(self):
+        return ('provider', self.id, self.updated_at)
+
 
 class SubscriptionPlan(db.Model):
     __tablename__ = 'subscription_plans'
@@ -78,6 +84,30 @@ class SubscriptionPlan(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    def to_summary_dict(self):
+        # 사용자 구독 응답에 포함되는 플랜 요약 정보
+        return {
+            'id': self.id,
+            'plan_name': self.plan_name,
+            'monthly_fee': float(self.monthly_fee),
+            'billing_cycle_months': self.billing_cycle_months,
+            'logo_file_name': self.logo_file_name,
+            'features': self.features,
+            'provider_name': self.provider.provider_name,
+        }
+
+    def to_catalog_dict(self):
+        # GET /sub/plans 카탈로그 항목
+        return {
+            **self.to_summary_dict(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def serialization_key(self):
+        # 제공업체 이름이 응답에 포함되므로 제공업체의 변경 시각도 키에 포함한다
+        return ('plan', self.id, self.updated_at) + self.provider.serialization_key()
+
 
 class UserSubscription(db.Model):
     __tablename__ = 'user_subscriptions'
@@ -106,6 +136,22 @@ class UserSubscription(db.Model):
     subscription_plan = relationship('SubscriptionPlan', back_populates='user_subscriptions')
     payments = relationship('SubscriptionPayment', back_populates='subscription')
 
+    __table_args__ = (
+        # 사용자+플랜 조회 (create_subscription, 결제 내역의 사용자 구독 조회, user_id 단독 조회)
+        db.Index('idx_user_subs_user_plan', user_id, subscription_plan_id),
+        db.Index('idx_user_subs_plan_id', subscription_plan_id),
+        # 사용자·플랜당 활성 구독 하나만 허용하며, 활성 구독 조회 (user_id, status='active')도 처리
+        db.Index(
+            ACTIVE_SUBSCRIPTION_CONSTRAINT, user_id, subscription_plan_id,
+            unique=True, postgresql_where=status == 'active'
+        ),
+        # 갱신/만료 배치 작업의 결제일 순 조회
+        db.Index(
+            'idx_user_subs_active_next_billing', next_billing_date, id,
+            postgresql_where=status == 'active'
+        ),
+    )
+
     def __repr__(self):
         return f'<UserSubscription {self.id}: Plan {self.subscription_plan_id} - {self.status}>'
 
@@ -123,6 +169,22 @@ class UserSubscription(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    def to_plan_dict(self):
+        # GET /sub/plans/user 응답 항목
+        return {
+            'subscription_id': self.id,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'next_billing_date': self.next_billing_date.isoformat() if self.next_billing_date else None,
+            'auto_renewal': self.auto_renewal,
+            'status': self.status,
+            'plan': self.subscription_plan.to_summary_dict(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def serialization_key(self):
+        return ('user_subscription', self.id, self.updated_at) + self.subscription_plan.serialization_key()
+
 
 class SubscriptionPayment(db.Model):
     __tablename__ = 'subscription_payments'
@@ -147,6 +209,11 @@ class SubscriptionPayment(db.Model):
     # Relationships
     subscription = relationship('UserSubscription', back_populates='payments')
 
+    __table_args__ = (
+        # GET /sub/payments 커서 페이지네이션 (payment_date DESC, id DESC) 접근 경로
+        db.Index('idx_subscription_payments_sub_date_id', user_subscription_id, payment_date.desc(), id.desc()),
+    )
+
     def __repr__(self):
         return f'<SubscriptionPayment {self.id}: {self.amount_paid} - {self.payment_status}>'
 
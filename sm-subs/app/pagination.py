@@ -0,0 +1,26 @@
+"""
+키셋(커서) 페이지네이션 커서 인코딩.
+
+커서는 마지막 항목의 정렬 키 (payment_date, id)를 담은 base64url 문자열이며,
+클라이언트는 내용을 해석하지 않고 next_cursor 값을 그대로 돌려보낸다.
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(payment_date, payment_id):
+    raw = json.dumps([payment_date.isoformat(), payment_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    커서를 (payment_date, id)로 해석한다. 형식이 잘못되면 ValueError가 발생한다.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payment_date, payment_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payment_date), int(payment_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
@@ -0,0 +1,73 @@
+"""
+핫 쿼리 실행 계획 점검.
+
+주요 쿼리를 EXPLAIN (FORMAT JSON)으로 확인하여 순차 스캔(Seq Scan)으로 떨어지면 실패로 보고한다.
+개발/CI 데이터는 작아서 플래너가 인덱스가 있어도 순차 스캔을 고를 수 있으므로,
+트랜잭션 안에서 SET LOCAL enable_seqscan = off로 인덱스 사용이 가능한지만 확인한다.
+"""
+from datetime import date
+
+from sqlalchemy import text
+
+from app import db
+from app.billing import due_subscriptions_query, lapsed_ids_select
+from app.models import SubscriptionPayment
+from app.routes import (
+    active_subscriptions_query, bulk_active_plans_query,
+    user_payments_query, user_plan_subscription_query
+)
+
+# 계획만 확인하므로 값 자체는 의미가 없다
+SAMPLE_USER_ID = 1
+SAMPLE_PLAN_ID = 1
+SAMPLE_BATCH_SIZE = 100
+
+
+def hot_queries():
+    """
+    (이름, SQLAlchemy 문) 목록.
+    """
+    today = date.today()
+    return [
+        ('create_subscription: user plan lookup',
+         user_plan_subscription_query(SAMPLE_USER_ID, SAMPLE_PLAN_ID).statement),
+        ('get_user_subscription_plans: active subscriptions',
+         active_subscriptions_query(SAMPLE_USER_ID).statement),
+        ('get_bulk_user_subscription_plans: active plans for many users',
+         bulk_active_plans_query([SAMPLE_USER_ID, SAMPLE_USER_ID + 1]).statement),
+        ('get_user_payments: keyset page',
+         user_payments_query(SAMPLE_USER_ID)
+         .order_by(SubscriptionPayment.payment_date.desc(), SubscriptionPayment.id.desc())
+         .limit(SAMPLE_BATCH_SIZE)
+         .statement),
+        ('renew-subscriptions: due batch', due_subscriptions_query(today, SAMPLE_BATCH_SIZE).statement),
+        ('expire-subscriptions: lapsed batch', lapsed_ids_select(today, SAMPLE_BATCH_SIZE)),
+    ]
+
+
+def find_seq_scans(plan):
+    """
+    EXPLAIN JSON 계획 트리에서 순차 스캔하는 테이블 이름 목록을 반환한다.
+    """
+    relations = []
+    if plan.get('Node Type') == 'Seq Scan':
+        relations.append(plan.get('Relation Name'))
+    for child in plan.get('Plans', []):
+        relations.extend(find_seq_scans(child))
+    return relations
+
+
+def check_query_plans():
+    """
+    각 핫 쿼리를 점검하여 (이름, 순차 스캔 테이블 목록) 목록을 반환한다. 목록이 비어 있으면 통과.
+    """
+    results = []
+    try:
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+        for name, statement in hot_queries():
+            sql = statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+            explain = db.session.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+            results.append((name, find_seq_scans(explain[0]['Plan'])))
+    finally:
+        db.session.rollback()
+    return results
@@ -0,0 +1,104 @@
+"""
+비활성 사용자 토큰 거절.
+
+sm-user가 관리하는 Redis 집합(DEACTIVATED_USERS_KEY)을 프로세스 메모리에 frozenset으로 들고,
+JWT 검사 훅(token_in_blocklist_loader)에서 토큰 주체가 집합에 있는지만 확인한다 (네트워크 왕복 없음).
+USER_STATUS_CHANNEL 변경분을 백그라운드 스레드에서 받아 반영하고, 메시지 유실에 대비해
+(재)구독할 때와 DEACTIVATED_USERS_REFRESH_SECOND마다 집합 전체를 다시 읽는다.
+Redis에 접근할 수 없으면 마지막으로 읽은 집합을 계속 사용한다 (처음부터 없으면 모두 허용).
+"""
+import json
+import threading
+import time
+
+from redis.exceptions import RedisError
+
+
+class DeactivatedUsers:
+
+    def __init__(self, redis, key, channel, refresh_interval, logger):
+        self.redis = redis
+        self.key = key
+        self.channel = channel
+        self.refresh_interval = refresh_interval
+        self.logger = logger
+        # 읽기는 잠금 없이 하고, 갱신은 새 frozenset으로 통째로 교체한다
+        self._user_ids = frozenset()
+        self._lock = threading.Lock()
+        self._listener = None
+
+    @classmethod
+    def from_app(cls, app):
+        return cls(
+            redis=app.redis,
+            key=app.config['DEACTIVATED_USERS_KEY'],
+            channel=app.config['USER_STATUS_CHANNEL'],
+            refresh_interval=app.config['DEACTIVATED_USERS_REFRESH_SECOND'],
+            logger=app.logger,
+        )
+
+    def __contains__(self, user_id):
+        try:
+            return int(user_id) in self._user_ids
+        except (TypeError, ValueError):
+            # 서비스 토큰처럼 사용자 ID가 아닌 주체
+            return False
+
+    def __len__(self):
+        return len(self._user_ids)
+
+    def reload(self):
+        user_ids = frozenset(int(user_id) for user_id in self.redis.smembers(self.key))
+        with self._lock:
+            self._user_ids = user_ids
+
+    def apply(self, payload):
+        with self._lock:
+            user_ids = set(self._user_ids)
+            user_ids.difference_update(int(user_id) for user_id in payload.get('activated', []))
+            user_ids.update(int(user_id) for user_id in payload.get('deactivated', []))
+            self._user_ids = frozenset(user_ids)
+
+    def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                self.reload()
+                reloaded_at = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message['type'] == 'message':
+                        try:
+                            self.apply(json.loads(message['data']))
+                        except (ValueError, TypeError) as e:
+                            self.logger.warning('Ignored malformed user status message: %s', e)
+                    if time.monotonic() - reloaded_at >= self.refresh_interval:
+                        self.reload()
+                        reloaded_at = time.monotonic()
+            except RedisError as e:
+                self.logger.warning('Deactivated user listener error: %s', e)
+                time.sleep(1)
+            except Exception:
+                # 예상하지 못한 오류로 리스너 스레드가 끝나면 이후 비활성화가 반영되지 않으므로 다시 구독한다
+                self.logger.exception('Unexpected deactivated user listener error')
+                time.sleep(1)
+            finally:
+                pubsub.close()
+
+    def start_listener(self):
+        if self._listener is None or not self._listener.is_alive():
+            self._listener = threading.Thread(target=self._listen, name='deactivated-users', daemon=True)
+            self._listener.start()
+
+
+def register_revocation(app, jwt):
+    """
+    app.deactivated_users를 만들고 비활성 사용자의 토큰을 거절하는 JWT 훅을 등록한다.
+    """
+    app.deactivated_users = DeactivatedUsers.from_app(app)
+    app.deactivated_users.start_listener()
+
+    @jwt.token_in_blocklist_loader
+    def is_user_deactivated(jwt_header, jwt_payload):
+        return jwt_payload.get('sub') in app.deactivated_users
@@ -1,16 +1,48 @@
+import csv
+import io
+import logging
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta  # 새로 추가
 from http import HTTPStatus
 
-from flask import Blueprint, request, jsonify, current_app
+import orjson
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from app import db
-from app.models import SubscriptionProvider, UserSubscription, SubscriptionPayment, SubscriptionPlan
+from app.auth import internal_api_required, jwt_or_internal_api_required
+from app.catalog import get_catalog
+from app.db_pool import pool_stats
+from app.serialization import json_array, json_response, user_subscription_fragment
+from app.models import (
+    ACTIVE_SUBSCRIPTION_CONSTRAINT, SubscriptionProvider, UserSubscription, SubscriptionPayment, SubscriptionPlan,
+)
+from app.pagination import decode_cursor, encode_cursor
+from sqlalchemy import text, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 
 bp = Blueprint('api', __name__)
 
+# 호출이 많은 플랜 조회 엔드포인트의 로거 (LOG_SAMPLE_RATES로 INFO 로그 샘플링)
+plans_logger = logging.getLogger(f'{__name__}.plans')
+
+
+def violated_constraint(error):
+    """
+    IntegrityError가 위반한 제약(인덱스) 이름. 드라이버가 알려 주지 않으면 None.
+    """
+    diag = getattr(error.orig, 'diag', None)
+    return getattr(diag, 'constraint_name', None)
+
+
+def is_user_id_list(value):
+    """
+    요청 본문의 user_ids가 정수 목록이면 True. true/false는 파이썬에서 int로 취급되므로 거른다.
+    """
+    return isinstance(value, list) and all(type(user_id) is int for user_id in value)
+
+
 @bp.route('/sub', methods=['POST'])
 @jwt_required()
 def create_subscription():
@@ -19,13 +51,14 @@ def create_subscription():
     """
     current_user_id = get_jwt_identity()
     data = request.get_json()
-    current_app.logger.info(f'User {current_user_id} is attempting to create a subscription with data: {data}')
+    # 요청 본문(결제 수단 등)은 로그에 남기지 않는다
+    current_app.logger.info('User %s is attempting to create a subscription', current_user_id)
 
     try:
         required_fields = ['subscription_plan_id', 'start_date', 'payment_method']
         for field in required_fields:
             if field not in data:
-                current_app.logger.warning(f'Missing required field: {field}')
+                current_app.logger.warning('Missing required field: %s', field)
                 return jsonify({'error': f'Required field is missing: {field}'}), HTTPStatus.BAD_REQUEST
 
         subscription_plan = SubscriptionPlan.query.get(data['subscription_plan_id'])
@@ -34,10 +67,7 @@ def create_subscription():
             return jsonify({'error': 'Subscription plan not found.'}), HTTPStatus.BAD_REQUEST
 
         # 사용자의 해당 플랜에 대한 구독 확인 (상태 무관)
-        existing = UserSubscription.query.filter_by(
-            user_id=current_user_id,
-            subscription_plan_id=data['subscription_plan_id']
-        ).first()
+        existing = user_plan_subscription_query(current_user_id, data['subscription_plan_id']).first()
 
         if existing:
             if existing.status == 'active':
@@ -63,7 +93,7 @@ def create_subscription():
             db.session.add(payment)
             db.session.commit()
 
-            current_app.logger.info(f'Reactivated subscription {existing.id} for user {current_user_id}')
+            current_app.logger.info('Reactivated subscription %s for user %s', existing.id, current_user_id)
             return jsonify({
                 'message': 'Subscription reactivated successfully.',
                 'subscription': existing.to_dict()
@@ -85,7 +115,7 @@ def create_subscription():
         db.session.add(subscription)
         db.session.flush()
 
-        current_app.logger.info(f'Created subscription {subscription.id} for user {current_user_id}')
+        current_app.logger.info('Created subscription %s for user %s', subscription.id, current_user_id)
 
         payment = SubscriptionPayment(
             user_subscription_id=subscription.id,
@@ -97,7 +127,7 @@ def create_subscription():
         db.session.add(payment)
         db.session.commit()
 
-        current_app.logger.info(f'Payment record created for subscription {subscription.id}')
+        current_app.logger.info('Payment record created for subscription %s', subscription.id)
         return jsonify({
             'message': 'Subscription created successfully.',
             'subscription': subscription.to_dict()
@@ -105,10 +135,18 @@ def create_subscription():
 
     except ValueError as e:
         db.session.rollback()
-        current_app.logger.error(f'ValueError occurred: {str(e)}', exc_info=True)
+        current_app.logger.error('ValueError occurred: %s', e, exc_info=True)
         return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except IntegrityError as e:
+        db.session.rollback()
+        # 동시 요청이 먼저 같은 플랜을 활성화한 경우만 409로 응답하고, 다른 제약 위반은 서버 오류로 처리한다
+        if violated_constraint(e) != ACTIVE_SUBSCRIPTION_CONSTRAINT:
+            current_app.logger.error('Error occurred while creating subscription: %s', e, exc_info=True)
+            return jsonify({'error': 'A server error occurred.'}), HTTPStatus.INTERNAL_SERVER_ERROR
+        current_app.logger.warning('Concurrent active subscription for user %s: %s', current_user_id, e)
+        return jsonify({'error': 'An active subscription already exists.'}), HTTPStatus.CONFLICT
     except Exception as e:
-        current_app.logger.error(f'Error occurred while creating subscription: {str(e)}', exc_info=True)
+        current_app.logger.error('Error occurred while creating subscription: %s', e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': 'A server error occurred.'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -119,63 +157,46 @@ def get_subscription(subscription_id):
     특정 구독 정보를 조회하는 엔드포인트.
     """
     current_user_id = get_jwt_identity()
-    current_app.logger.info(f'User {current_user_id} is requesting subscription {subscription_id}')
+    current_app.logger.info('User %s is requesting subscription %s', current_user_id, subscription_id)
 
     try:
         subscription = UserSubscription.query.get(subscription_id)
         if not subscription:
-            current_app.logger.warning(f'Subscription {subscription_id} not found.')
+            current_app.logger.warning('Subscription %s not found.', subscription_id)
             return jsonify({'error': 'Subscription information not found.'}), HTTPStatus.NOT_FOUND
 
         if str(subscription.user_id) != current_user_id:
             current_app.logger.warning(
-                f'Unauthorized access attempt: user_id={current_user_id}, subscription_id={subscription_id}')
+                'Unauthorized access attempt: user_id=%s, subscription_id=%s', current_user_id, subscription_id)
             return jsonify({'error': 'Access denied.'}), HTTPStatus.FORBIDDEN
 
         return jsonify(subscription.to_dict()), HTTPStatus.OK
 
     except Exception as e:
-        current_app.logger.error(f'Error occurred while retrieving subscription: {str(e)}', exc_info=True)
+        current_app.logger.error('Error occurred while retrieving subscription: %s', e, exc_info=True)
         return jsonify({'error': 'A server error occurred.'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @bp.route('/sub/plans', methods=['GET'])
-@jwt_required()
+@jwt_or_internal_api_required
 def get_subscription_plans():
     """
     활성화된 구독 요금제 및 제공업체 정보를 조회하는 엔드포인트.
     """
     try:
-        current_app.logger.info('Fetching all active subscription plans.')
-
-        # SubscriptionPlan을 가져올 때 SubscriptionProvider 정보를 함께 로드
-        plans = (
-            SubscriptionPlan.query
-            .filter_by(is_active=True)
-            .options(joinedload(SubscriptionPlan.provider))  # SQLAlchemy ORM 조인
-            .order_by(SubscriptionPlan.id.asc())  # 이름 기준 오름차순 정렬
-            .all()
-        )
+        plans_logger.info('Fetching all active subscription plans.')
 
-        # JSON 응답으로 변환
-        plan_list = [
-            {
-                "id": plan.id,
-                "plan_name": plan.plan_name,
-                "monthly_fee": float(plan.monthly_fee),
-                "billing_cycle_months": plan.billing_cycle_months,
-                "logo_file_name": plan.logo_file_name,
-                "features": plan.features,
-                "provider_name": plan.provider.provider_name,
-                "created_at": plan.created_at.isoformat() if plan.created_at else None,
-                "updated_at": plan.updated_at.isoformat() if plan.updated_at else None
-            }
-            for plan in plans
-        ]
+        # 카탈로그는 버전 키 기반 캐시에서 직렬화된 본문과 ETag로 가져온다
+        body, etag = get_catalog()
 
-        return jsonify(plan_list), 200
+        response = json_response(body)
+        response.set_etag(etag)
+        # 클라이언트는 매번 If-None-Match로 재검증하여 변경이 없으면 304를 받는다
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
     except Exception as e:
-        current_app.logger.error(f"Error fetching subscription plans: {str(e)}")
+        current_app.logger.error("Error fetching subscription plans: %s", e)
         return jsonify({"error": "Internal Server Error"}), 500
 
 @bp.route('/sub/plans/user', methods=['GET'])
@@ -185,47 +206,53 @@ def get_user_subscription_plans():
     현재 로그인한 사용자의 구독 플랜 정보를 조회하는 엔드포인트
     """
     try:
-        current_app.logger.info('Fetching user subscription plans')
+        plans_logger.info('Fetching user subscription plans')
         user_id = get_jwt_identity()
 
         # 사용자의 구독 정보 조회
-        subscriptions = (
-            UserSubscription.query
-            .join(SubscriptionPlan)
-            .join(SubscriptionProvider)
-            .filter(UserSubscription.user_id == user_id)
-            .filter(UserSubscription.status == 'active')
-            .options(joinedload(UserSubscription.subscription_plan).joinedload(SubscriptionPlan.provider))
-            .order_by(UserSubscription.id.asc())
-            .all()
-        )
+        subscriptions = active_subscriptions_query(user_id).all()
 
-        subscription_list = [
-            {
-                "subscription_id": sub.id,
-                "start_date": sub.start_date.isoformat() if sub.start_date else None,
-                "next_billing_date": sub.next_billing_date.isoformat() if sub.next_billing_date else None,
-                "auto_renewal": sub.auto_renewal,
-                "status": sub.status,
-                "plan": {
-                    "id": sub.subscription_plan.id,
-                    "plan_name": sub.subscription_plan.plan_name,
-                    "monthly_fee": float(sub.subscription_plan.monthly_fee),
-                    "billing_cycle_months": sub.subscription_plan.billing_cycle_months,
-                    "logo_file_name": sub.subscription_plan.logo_file_name,
-                    "features": sub.subscription_plan.features,
-                    "provider_name": sub.subscription_plan.provider.provider_name,
-                },
-                "created_at": sub.created_at.isoformat() if sub.created_at else None,
-                "updated_at": sub.updated_at.isoformat() if sub.updated_at else None
-            }
-            for sub in subscriptions
-        ]
+        # 행 단위로 캐시된 JSON 조각을 이어 붙여 응답 본문을 만든다
+        body = json_array(user_subscription_fragment(sub) for sub in subscriptions)
 
-        return jsonify(subscription_list), 200
+        return json_response(body)
 
     except Exception as e:
-        current_app.logger.error(f"Error fetching user subscription plans: {str(e)}")
+        current_app.logger.error("Error fetching user subscription plans: %s", e)
+        return jsonify({"error": "Internal Server Error"}), 500
+
+@bp.route('/sub/plans/users', methods=['POST'])
+@internal_api_required
+def get_bulk_user_subscription_plans():
+    """
+    여러 사용자의 활성 구독 플랜 ID와 제공업체 이름을 한 번에 조회하는 내부 서비스용 엔드포인트.
+    응답: {"<user_id>": {"plan_ids": [...], "provider_names": [...]}, ...}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids')
+        if not is_user_id_list(user_ids):
+            return jsonify({'error': 'user_ids must be a list of integers.'}), HTTPStatus.BAD_REQUEST
+
+        max_user_ids = current_app.config['BULK_MAX_USER_IDS']
+        if len(user_ids) > max_user_ids:
+            return jsonify({'error': f'Too many user_ids (max {max_user_ids}).'}), HTTPStatus.BAD_REQUEST
+
+        current_app.logger.info('Fetching subscription plans for %s users', len(user_ids))
+
+        rows = bulk_active_plans_query(user_ids).all()
+
+        users = {user_id: {'plan_ids': [], 'provider_names': []} for user_id in user_ids}
+        for user_id, plan_id, provider_name in rows:
+            entry = users[user_id]
+            entry['plan_ids'].append(plan_id)
+            if provider_name not in entry['provider_names']:
+                entry['provider_names'].append(provider_name)
+
+        return json_response(orjson.dumps(users, option=orjson.OPT_NON_STR_KEYS))
+
+    except Exception as e:
+        current_app.logger.error("Error fetching bulk user subscription plans: %s", e)
         return jsonify({"error": "Internal Server Error"}), 500
 
 @bp.route('/sub/<int:subscription_id>/extend', methods=['POST'])
@@ -235,23 +262,23 @@ def extend_subscription(subscription_id):
     사용자의 활성 구독을 연장하는 엔드포인트.
     """
     current_user_id = get_jwt_identity()
-    current_app.logger.info(f'User {current_user_id} is attempting to extend subscription {subscription_id}')
+    current_app.logger.info('User %s is attempting to extend subscription %s', current_user_id, subscription_id)
 
     try:
         # 구독 정보 조회
         subscription = UserSubscription.query.get(subscription_id)
         if not subscription:
-            current_app.logger.warning(f'Subscription {subscription_id} not found.')
+            current_app.logger.warning('Subscription %s not found.', subscription_id)
             return jsonify({'error': 'Subscription not found.'}), HTTPStatus.NOT_FOUND
 
         # 사용자가 해당 구독의 소유자인지 확인
         if str(subscription.user_id) != current_user_id:
-            current_app.logger.warning(f'Unauthorized access attempt by user {current_user_id} to extend subscription {subscription_id}')
+            current_app.logger.warning('Unauthorized access attempt by user %s to extend subscription %s', current_user_id, subscription_id)
             return jsonify({'error': 'Access denied.'}), HTTPStatus.FORBIDDEN
 
         # 이미 취소된 경우 연장 불가
         if subscription.status in ['cancelled', 'expired', 'suspended']:
-            current_app.logger.info(f'Subscription {subscription_id} is {subscription.status} and cannot be extended.')
+            current_app.logger.info('Subscription %s is %s and cannot be extended.', subscription_id, subscription.status)
             return jsonify({'error': f'Cannot extend a {subscription.status} subscription.'}), HTTPStatus.BAD_REQUEST
 
         # 현재 결제 주기를 기준으로 연장
@@ -260,11 +287,11 @@ def extend_subscription(subscription_id):
         subscription.updated_at = datetime.utcnow()
         db.session.commit()
 
-        current_app.logger.info(f'Subscription {subscription_id} successfully extended.')
+        current_app.logger.info('Subscription %s successfully extended.', subscription_id)
         return jsonify({'message': 'Subscription extended successfully.', 'new_billing_date': subscription.next_billing_date}), HTTPStatus.OK
 
     except Exception as e:
-        current_app.logger.error(f'Error occurred while extending subscription: {str(e)}', exc_info=True)
+        current_app.logger.error('Error occurred while extending subscription: %s', e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': 'A server error occurred.'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -275,23 +302,23 @@ def cancel_subscription(subscription_id):
     사용자의 활성 구독을 취소하는 엔드포인트.
     """
     current_user_id = get_jwt_identity()
-    current_app.logger.info(f'User {current_user_id} is attempting to cancel subscription {subscription_id}')
+    current_app.logger.info('User %s is attempting to cancel subscription %s', current_user_id, subscription_id)
 
     try:
         # 구독 정보 조회
         subscription = UserSubscription.query.get(subscription_id)
         if not subscription:
-            current_app.logger.warning(f'Subscription {subscription_id} not found.')
+            current_app.logger.warning('Subscription %s not found.', subscription_id)
             return jsonify({'error': 'Subscription not found.'}), HTTPStatus.NOT_FOUND
 
         # 사용자가 해당 구독의 소유자인지 확인
         if str(subscription.user_id) != current_user_id:
-            current_app.logger.warning(f'Unauthorized access attempt by user {current_user_id} to cancel subscription {subscription_id}')
+            current_app.logger.warning('Unauthorized access attempt by user %s to cancel subscription %s', current_user_id, subscription_id)
             return jsonify({'error': 'Access denied.'}), HTTPStatus.FORBIDDEN
 
         # 이미 취소된 경우
         if subscription.status == 'cancelled':
-            current_app.logger.info(f'Subscription {subscription_id} is already canceled.')
+            current_app.logger.info('Subscription %s is already canceled.', subscription_id)
             return jsonify({'message': 'Subscription is already canceled.'}), HTTPStatus.OK
 
         # 구독 상태 업데이트
@@ -299,11 +326,11 @@ def cancel_subscription(subscription_id):
         subscription.updated_at = datetime.utcnow()
         db.session.commit()
 
-        current_app.logger.info(f'Subscription {subscription_id} successfully canceled.')
+        current_app.logger.info('Subscription %s successfully canceled.', subscription_id)
         return jsonify({'message': 'Subscription canceled successfully.'}), HTTPStatus.OK
 
     except Exception as e:
-        current_app.logger.error(f'Error occurred while canceling subscription: {str(e)}', exc_info=True)
+        current_app.logger.error('Error occurred while canceling subscription: %s', e, exc_info=True)
         db.session.rollback()
         return jsonify({'error': 'A server error occurred.'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -343,14 +370,105 @@ def create_subscription_payment():
         db.session.add(payment)
         db.session.commit()
 
-        current_app.logger.info(f'Created new subscription payment: {payment.id}')
+        current_app.logger.info('Created new subscription payment: %s', payment.id)
         return jsonify(payment.to_dict()), 201
 
     except Exception as e:
-        current_app.logger.error(f"Error creating subscription payment: {str(e)}")
+        current_app.logger.error("Error creating subscription payment: %s", e)
         db.session.rollback()
         return jsonify({"error": "Internal Server Error"}), 500
 
+
+def user_plan_subscription_query(user_id, subscription_plan_id):
+    """
+    사용자의 특정 플랜 구독 조회 쿼리 (상태 무관). idx_user_subs_user_plan을 사용한다.
+    """
+    return UserSubscription.query.filter_by(
+        user_id=user_id,
+        subscription_plan_id=subscription_plan_id
+    )
+
+
+def active_subscriptions_query(user_id):
+    """
+    사용자의 활성 구독 조회 쿼리 (플랜/제공업체 함께 로딩). uq_user_subs_active_user_plan을 사용한다.
+    """
+    return (
+        UserSubscription.query
+        .join(SubscriptionPlan)
+        .join(SubscriptionProvider)
+        .filter(UserSubscription.user_id == user_id)
+        .filter(UserSubscription.status == 'active')
+        .options(joinedload(UserSubscription.subscription_plan).joinedload(SubscriptionPlan.provider))
+        .order_by(UserSubscription.id.asc())
+    )
+
+
+def bulk_active_plans_query(user_ids):
+    """
+    여러 사용자의 (user_id, plan_id, provider_name) 조회 쿼리. 필요한 컬럼만 조회한다 (ORM 엔티티 로딩 없음).
+    """
+    return (
+        db.session.query(
+            UserSubscription.user_id,
+            SubscriptionPlan.id,
+            SubscriptionProvider.provider_name
+        )
+        .join(SubscriptionPlan, UserSubscription.subscription_plan_id == SubscriptionPlan.id)
+        .join(SubscriptionProvider, SubscriptionPlan.provider_id == SubscriptionProvider.id)
+        .filter(UserSubscription.user_id.in_(user_ids))
+        .filter(UserSubscription.status == 'active')
+        .order_by(UserSubscription.user_id.asc(), UserSubscription.id.asc())
+    )
+
+
+def user_payments_query(user_id, payment_status=None):
+    """
+    사용자의 결제 내역 조회 쿼리 (플랜/제공업체 이름 포함). 정렬은 호출하는 쪽에서 지정한다.
+    """
+    subquery = (db.session.query(
+        UserSubscription.id,
+        SubscriptionPlan.plan_name,
+        SubscriptionProvider.provider_name
+    )
+                .join(SubscriptionPlan, UserSubscription.subscription_plan_id == SubscriptionPlan.id)
+                .join(SubscriptionProvider, SubscriptionPlan.provider_id == SubscriptionProvider.id)
+                .filter(UserSubscription.user_id == user_id)
+                .subquery())
+
+    query = (db.session.query(
+        SubscriptionPayment.id,
+        subquery.c.plan_name,
+        subquery.c.provider_name,
+        SubscriptionPayment.amount_paid,
+        SubscriptionPayment.payment_date,
+        SubscriptionPayment.payment_status,
+        SubscriptionPayment.payment_method
+    )
+             .join(subquery, SubscriptionPayment.user_subscription_id == subquery.c.id))
+
+    # 결제 상태 필터 적용
+    if payment_status:
+        query = query.filter(SubscriptionPayment.payment_status == payment_status)
+
+    return query
+
+
+PAYMENT_FIELDS = ('id', 'plan_name', 'provider_name', 'amount_paid', 'payment_date', 'payment_status', 'payment_method')
+
+
+def format_payment(payment):
+    return {
+        'id': payment.id,
+        'plan_name': payment.plan_name,
+        'provider_name': payment.provider_name,
+        'amount_paid': float(payment.amount_paid),
+        'payment_date': payment.payment_date.isoformat() if payment.payment_date else None,
+        'payment_status': payment.payment_status,
+        'payment_method': payment.payment_method
+    }
+
+
 @bp.route('/sub/payments', methods=['GET'])
 @jwt_required()
 def get_user_payments():
@@ -367,61 +485,124 @@ def get_user_payments():
         # 결제 상태 필터
         payment_status = request.args.get('status')
 
-        subquery = (db.session.query(
-            UserSubscription.id,
-            SubscriptionPlan.plan_name,
-            SubscriptionProvider.provider_name
-        )
-                    .join(SubscriptionPlan, UserSubscription.subscription_plan_id == SubscriptionPlan.id)
-                    .join(SubscriptionProvider, SubscriptionPlan.provider_id == SubscriptionProvider.id)
-                    .filter(UserSubscription.user_id == current_user_id)
-                    .subquery())
-
-        query = (db.session.query(
-            SubscriptionPayment.id,
-            subquery.c.plan_name,
-            subquery.c.provider_name,
-            SubscriptionPayment.amount_paid,
-            SubscriptionPayment.payment_date,
-            SubscriptionPayment.payment_status,
-            SubscriptionPayment.payment_method
-        )
-                 .join(subquery, SubscriptionPayment.user_subscription_id == subquery.c.id))
-
-        # 결제 상태 필터 적용
-        if payment_status:
-            query = query.filter(SubscriptionPayment.payment_status == payment_status)
-
-        # 페이지네이션 적용
-        paginated_query = query.order_by(SubscriptionPayment.payment_date.desc())
-        page_items = paginated_query.paginate(page=page, per_page=per_page, error_out=False)
-
-        # 응답 데이터 구성
-        def format_payment(payment):
-            return {
-                'id': payment.id,
-                'plan_name': payment.plan_name,
-                'provider_name': payment.provider_name,
-                'amount_paid': float(payment.amount_paid),
-                'payment_date': payment.payment_date.isoformat() if payment.payment_date else None,
-                'payment_status': payment.payment_status,
-                'payment_method': payment.payment_method
-            }
+        query = user_payments_query(current_user_id, payment_status)
+
+        if 'cursor' in request.args or request.args.get('pagination') == 'cursor':
+            # 커서 모드: (payment_date, id) 키셋 조건으로 OFFSET과 COUNT(*) 없이 다음 페이지를 조회
+            per_page = max(1, min(per_page, current_app.config['PAYMENTS_MAX_PER_PAGE']))
+            cursor = request.args.get('cursor')
+            try:
+                after = decode_cursor(cursor) if cursor else None
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor.'}), HTTPStatus.BAD_REQUEST
+
+            keyset_query = query
+            if after:
+                keyset_query = keyset_query.filter(
+                    tuple_(SubscriptionPayment.payment_date, SubscriptionPayment.id) < after
+                )
+            rows = (
+                keyset_query
+                .order_by(SubscriptionPayment.payment_date.desc(), SubscriptionPayment.id.desc())
+                .limit(per_page + 1)
+                .all()
+            )
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
 
-        response_data = {
-            'items': [format_payment(payment) for payment in page_items.items],
-            'total': page_items.total,
-            'pages': page_items.pages,
-            'current_page': page_items.page
-        }
+            response_data = {
+                'items': [format_payment(payment) for payment in rows],
+                'next_cursor': encode_cursor(rows[-1].payment_date, rows[-1].id) if has_more else None,
+                'has_more': has_more
+            }
+            # 전체 건수는 요청한 경우에만 계산
+            if request.args.get('include_total', 'false').lower() == 'true':
+                response_data['total'] = query.order_by(None).count()
+        else:
+            # 페이지 번호 모드 (기존 클라이언트 호환)
+            paginated_query = query.order_by(SubscriptionPayment.payment_date.desc())
+            page_items = paginated_query.paginate(page=page, per_page=per_page, error_out=False)
+
+            response_data = {
+                'items': [format_payment(payment) for payment in page_items.items],
+                'total': page_items.total,
+                'pages': page_items.pages,
+                'current_page': page_items.page
+            }
 
-        current_app.logger.info(f'Successfully fetched payments for user {current_user_id}')
+        current_app.logger.info('Successfully fetched payments for user %s', current_user_id)
         return jsonify(response_data), 200
 
     except Exception as e:
-        current_app.logger.error(f"Error fetching user payments: {str(e)}")
+        current_app.logger.error("Error fetching user payments: %s", e)
         return jsonify({"error": "Internal Server Error"}), 500
 
+@bp.route('/sub/payments/export', methods=['GET'])
+@jwt_required()
+def export_user_payments():
+    """
+    현재 사용자의 전체 결제 내역을 NDJSON 또는 CSV로 스트리밍하는 엔드포인트.
+    서버 측 커서(yield_per)로 배치 단위로 읽어 바로 내보내므로 행 수와 관계없이 메모리 사용량이 일정하다.
+    """
+    current_user_id = get_jwt_identity()
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv.'}), HTTPStatus.BAD_REQUEST
+
+    # 서버 측 커서를 연 트랜잭션은 느린 클라이언트를 기다리는 동안 idle in transaction 상태가 되므로,
+    # 이 세션에 한해 DB_IDLE_IN_TRANSACTION_TIMEOUT_MS를 끈다 (트랜잭션이 끝나면 원래 값으로 돌아간다)
+    db.session.execute(text('SET LOCAL idle_in_transaction_session_timeout = 0'))
+
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    query = (
+        user_payments_query(current_user_id, request.args.get('status'))
+        .order_by(SubscriptionPayment.payment_date.desc(), SubscriptionPayment.id.desc())
+        .yield_per(batch_size)
+    )
+
+    def generate_ndjson():
+        chunk = []
+        for payment in query:
+            chunk.append(orjson.dumps(format_payment(payment)))
+            if len(chunk) >= batch_size:
+                yield b'\n'.join(chunk) + b'\n'
+                chunk = []
+        if chunk:
+            yield b'\n'.join(chunk) + b'\n'
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(PAYMENT_FIELDS)
+        rows = 0
+        for payment in query:
+            formatted = format_payment(payment)
+            writer.writerow([formatted[field] for field in PAYMENT_FIELDS])
+            rows += 1
+            if rows % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def stream(generator):
+        try:
+            yield from generator()
+            current_app.logger.info('Exported payments for user %s as %s', current_user_id, export_format)
+        except Exception as e:
+            # 헤더가 이미 전송된 뒤이므로 오류 응답 대신 로그만 남기고 스트림을 끊는다
+            current_app.logger.error('Error exporting payments for user %s: %s', current_user_id, e, exc_info=True)
+            raise
+
+    if export_format == 'csv':
+        generator, mimetype = generate_csv, 'text/csv'
+    else:
+        generator, mimetype = generate_ndjson, 'application/x-ndjson'
+
+    response = current_app.response_class(stream_with_context(stream(generator)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=payments.{export_format}'
+    return response
+
 @bp.route('/health', methods=['GET'])
 def health_check():
     """
@@ -430,4 +611,30 @@ def health_check():
     return jsonify({
         'status': 'ok',
         'message': 'Server is healthy.'
-    }), HTTPStatus.OK
\ No newline at end of file
+    }), HTTPStatus.OK
+
+
+@bp.route('/health/live', methods=['GET'])
+def liveness_check():
+    """
+    프로세스가 요청을 처리할 수 있는지만 확인하는 엔드포인트 (의존성은 확인하지 않는다)
+    """
+    return jsonify({'status': 'ok'}), HTTPStatus.OK
+
+
+@bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    의존성을 제한 시간 안에 점검하는 엔드포인트. 하나라도 실패하거나 느리면 503을 반환한다.
+    """
+    ready, report = current_app.readiness.status()
+    return jsonify(report), HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE
+
+
+@bp.route('/health/db-pool', methods=['GET'])
+@internal_api_required
+def db_pool_stats():
+    """
+    DB 연결 풀 상태와 체크아웃 지표 (바인드별)
+    """
+    return jsonify(pool_stats(db.engines)), HTTPStatus.OK
@@ -0,0 +1,80 @@
+"""
+행 단위 JSON 직렬화 캐시.
+
+플랜/구독 응답은 같은 행을 요청마다 dict로 만들고 다시 JSON으로 인코딩한다.
+각 행의 인코딩 결과(bytes)를 (형식, id, updated_at ...) 키로 보관해 두고,
+응답은 보관된 조각을 이어 붙여 만든다. 행이 수정되면 updated_at이 바뀌므로
+이전 조각은 더 이상 조회되지 않고 LRU에서 자연스럽게 밀려난다.
+"""
+import threading
+from collections import OrderedDict
+
+import orjson
+from flask import current_app
+
+
+class FragmentCache:
+    """
+    스레드 안전한 크기 제한 LRU 캐시.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _fragment(form, row, to_dict):
+    key = (form,) + row.serialization_key()
+    cache = current_app.json_fragments
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = orjson.dumps(to_dict())
+        cache.set(key, fragment)
+    return fragment
+
+
+def plan_fragment(plan):
+    """
+    카탈로그 항목(SubscriptionPlan.to_catalog_dict)의 JSON bytes.
+    """
+    return _fragment('catalog', plan, plan.to_catalog_dict)
+
+
+def user_subscription_fragment(subscription):
+    """
+    사용자 구독 항목(UserSubscription.to_plan_dict)의 JSON bytes.
+    """
+    return _fragment('user_plan', subscription, subscription.to_plan_dict)
+
+
+def json_array(fragments):
+    """
+    JSON 조각 목록을 하나의 JSON 배열 bytes로 합친다.
+    """
+    return b'[' + b','.join(fragments) + b']'
+
+
+def json_response(body, status=200):
+    return current_app.response_class(body, status=status, mimetype='application/json')
@@ -0,0 +1,50 @@
+"""
+Gunicorn 설정 (프로덕션 실행: gunicorn -c gunicorn.conf.py run:app).
+
+pre-fork 워커 + 워커당 스레드(gthread) 모델이며, 모든 값은 환경 변수로 바꿀 수 있다.
+기본값(GUNICORN_PRELOAD=false)에서는 각 워커가 fork된 뒤 앱을 만들므로 DB/Redis 연결도 워커마다 새로 연다.
+preload를 켜면 post_fork에서 마스터로부터 물려받은 연결과 스레드를 다시 만든다.
+"""
+import glob
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+# SIGTERM을 받으면 새 요청을 받지 않고 처리 중인 요청이 끝나기를 이 시간만큼 기다린다
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# 메모리 누수 대비: 워커가 이만큼 요청을 처리하면 교체 (jitter로 워커들이 동시에 재시작하지 않도록 분산)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# 워커마다 따로 쌓이는 Prometheus 지표를 /metrics에서 합치기 위한 디렉터리 (앱을 불러오기 전에 설정해야 한다)
+prometheus_multiproc_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-multiproc')
+os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+# 이전 실행에서 남은 지표 파일을 지운다. preload를 켜면 on_starting보다 앱(지표)을 먼저 불러오므로
+# 설정 파일을 읽는 시점에 정리하고, HUP으로 설정을 다시 읽을 때는 실행 중인 워커의 파일을 지우지 않는다
+if os.environ.get('PROMETHEUS_MULTIPROC_CLEANED_BY') != str(os.getpid()):
+    for path in glob.glob(os.path.join(prometheus_multiproc_dir, '*.db')):
+        os.remove(path)
+    os.environ['PROMETHEUS_MULTIPROC_CLEANED_BY'] = str(os.getpid())
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app import reinit_after_fork
+        from run import app as flask_app
+        reinit_after_fork(flask_app)
+
+
+def child_exit(server, worker):
+    # 종료된 워커의 livesum 게이지 값을 합계에서 뺀다
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
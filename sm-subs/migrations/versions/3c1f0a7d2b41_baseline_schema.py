@@ -0,0 +1,81 @@
+"""baseline schema (sm-db/sqls/subs.sql before hot-path indexes)
+
+Revision ID: 3c1f0a7d2b41
+Revises: 
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '3c1f0a7d2b41'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 이미 subs.sql로 만든 데이터베이스는 이 리비전을 실행하지 않고 `flask db stamp 3c1f0a7d2b41`로 표시한다
+    op.create_table(
+        'subscription_providers',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('provider_name', sa.String(length=100), nullable=False, unique=True),
+        sa.Column('business_registration_number', sa.String(length=20)),
+        sa.Column('contact_email', sa.String(length=255)),
+        sa.Column('contact_phone', sa.String(length=20)),
+        sa.Column('status', sa.String(length=20), server_default='active'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("status IN ('active', 'inactive', 'suspended')"),
+    )
+    op.create_table(
+        'subscription_plans',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('provider_id', sa.Integer(), sa.ForeignKey('subscription_providers.id'), nullable=False),
+        sa.Column('plan_name', sa.String(length=100), nullable=False),
+        sa.Column('monthly_fee', sa.Numeric(10, 2), nullable=False),
+        sa.Column('billing_cycle_months', sa.Integer(), server_default='1'),
+        sa.Column('features', postgresql.JSONB()),
+        sa.Column('is_active', sa.Boolean(), server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('logo_file_name', sa.String(length=255)),
+        sa.UniqueConstraint('provider_id', 'plan_name'),
+    )
+    op.create_table(
+        'user_subscriptions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('subscription_plan_id', sa.Integer(), sa.ForeignKey('subscription_plans.id'), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('next_billing_date', sa.Date(), nullable=False),
+        sa.Column('auto_renewal', sa.Boolean(), server_default=sa.true()),
+        sa.Column('payment_method', sa.String(length=50)),
+        sa.Column('status', sa.String(length=20), server_default='active'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("status IN ('active', 'cancelled', 'suspended', 'expired')"),
+    )
+    op.create_index('idx_user_subs_user_id', 'user_subscriptions', ['user_id'])
+    op.create_index('idx_user_subs_plan_id', 'user_subscriptions', ['subscription_plan_id'])
+    op.create_table(
+        'subscription_payments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_subscription_id', sa.Integer(), sa.ForeignKey('user_subscriptions.id'), nullable=False),
+        sa.Column('amount_paid', sa.Numeric(10, 2), nullable=False),
+        sa.Column('payment_date', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('payment_status', sa.String(length=20), server_default='pending'),
+        sa.Column('payment_method', sa.String(length=50)),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("payment_status IN ('successful', 'failed', 'pending', 'refunded')"),
+    )
+    op.create_index('idx_subscription_payments_user_sub_id', 'subscription_payments', ['user_subscription_id'])
+
+
+def downgrade():
+    op.drop_table('subscription_payments')
+    op.drop_table('user_subscriptions')
+    op.drop_table('subscription_plans')
+    op.drop_table('subscription_providers')
@@ -0,0 +1,125 @@
+"""partial and composite indexes for hot queries
+
+Revision ID: 8e2d4b6f1a93
+Revises: 3c1f0a7d2b41
+Create Date: 2026-10-18 16:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8e2d4b6f1a93'
+down_revision = '3c1f0a7d2b41'
+branch_labels = None
+depends_on = None
+
+
+def _drop_invalid_index(name, table_name):
+    """
+    CONCURRENTLY 빌드가 실패하면 INVALID 인덱스가 남고, if_not_exists는 다시 실행해도 이를 건너뛴다.
+    남아 있는 INVALID 인덱스를 지워 다시 만들 수 있게 한다.
+    """
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).scalar()
+    if invalid:
+        op.drop_index(name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def _check_active_duplicates():
+    """
+    같은 사용자·플랜의 활성 구독이 여러 개면 유일 인덱스를 만들 수 없다.
+    어느 구독을 남길지는 결제 내역을 보고 정해야 하므로 자동으로 정리하지 않고 목록과 함께 중단한다.
+    """
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT user_id, subscription_plan_id, array_agg(id ORDER BY id) AS ids "
+        "FROM user_subscriptions WHERE status = 'active' "
+        "GROUP BY user_id, subscription_plan_id HAVING count(*) > 1 "
+        "ORDER BY user_id, subscription_plan_id LIMIT 20"
+    )).all()
+    if duplicates:
+        details = ', '.join(
+            f'user {row.user_id} plan {row.subscription_plan_id}: {list(row.ids)}' for row in duplicates
+        )
+        raise RuntimeError(
+            f'Cannot create uq_user_subs_active_user_plan: duplicate active subscriptions exist ({details}). '
+            "Cancel or expire the extra rows and run 'flask db upgrade' again."
+        )
+
+
+def upgrade():
+    indexes = (
+        ('idx_user_subs_user_plan', 'user_subscriptions'),
+        ('uq_user_subs_active_user_plan', 'user_subscriptions'),
+        ('idx_user_subs_active_next_billing', 'user_subscriptions'),
+        ('idx_subscription_payments_sub_date_id', 'subscription_payments'),
+    )
+    # 운영 중인 테이블에 쓰기 잠금을 걸지 않도록 CONCURRENTLY로 만들며, 이는 트랜잭션 밖에서만 실행할 수 있다
+    with op.get_context().autocommit_block():
+        for name, table_name in indexes:
+            _drop_invalid_index(name, table_name)
+
+        op.create_index(
+            'idx_user_subs_user_plan', 'user_subscriptions', ['user_id', 'subscription_plan_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        _check_active_duplicates()
+        try:
+            op.create_index(
+                'uq_user_subs_active_user_plan', 'user_subscriptions', ['user_id', 'subscription_plan_id'],
+                unique=True, postgresql_where=sa.text("status = 'active'"),
+                postgresql_concurrently=True, if_not_exists=True
+            )
+        except Exception:
+            # 확인 이후 빌드 도중 중복이 생긴 경우에도 INVALID 인덱스를 남기지 않는다
+            _drop_invalid_index('uq_user_subs_active_user_plan', 'user_subscriptions')
+            raise
+        op.create_index(
+            'idx_user_subs_active_next_billing', 'user_subscriptions', ['next_billing_date', 'id'],
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'idx_subscription_payments_sub_date_id', 'subscription_payments',
+            ['user_subscription_id', sa.text('payment_date DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # 새 복합 인덱스의 선두 컬럼과 겹치는 단일 컬럼 인덱스
+        op.drop_index(
+            'idx_user_subs_user_id', table_name='user_subscriptions',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'idx_subscription_payments_user_sub_id', table_name='subscription_payments',
+            postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_subscription_payments_user_sub_id', 'subscription_payments', ['user_subscription_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'idx_user_subs_user_id', 'user_subscriptions', ['user_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index(
+            'idx_subscription_payments_sub_date_id', table_name='subscription_payments',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'idx_user_subs_active_next_billing', table_name='user_subscriptions',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'uq_user_subs_active_user_plan', table_name='user_subscriptions',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'idx_user_subs_user_plan', table_name='user_subscriptions',
+            postgresql_concurrently=True, if_exists=True
+        )
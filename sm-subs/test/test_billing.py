@@ -0,0 +1,124 @@
+"""
+구독 갱신 결제일 계산과 배치 갱신 단위 테스트 (DB 없이 쿼리와 세션을 대체하여 실행).
+
+실행: cd sm-subs && python -m unittest discover -s test -p 'test_*.py'
+"""
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from dateutil.relativedelta import relativedelta
+from flask import Flask
+
+from app import billing
+from app.billing import next_billing_date_after
+
+
+class NextBillingDateTest(unittest.TestCase):
+
+    def test_advances_one_month(self):
+        self.assertEqual(next_billing_date_after(date(2024, 1, 15), date(2024, 2, 15), 1), date(2024, 3, 15))
+
+    def test_month_end_start_is_not_pulled_forward_by_short_months(self):
+        start = date(2024, 1, 31)
+        billing_date = start + relativedelta(months=1)
+        self.assertEqual(billing_date, date(2024, 2, 29))
+
+        dates = []
+        for _ in range(4):
+            billing_date = next_billing_date_after(start, billing_date, 1)
+            dates.append(billing_date)
+        self.assertEqual(dates, [date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31), date(2024, 6, 30)])
+
+    def test_multi_month_cycles(self):
+        self.assertEqual(next_billing_date_after(date(2024, 1, 31), date(2024, 4, 30), 3), date(2024, 7, 31))
+        self.assertEqual(next_billing_date_after(date(2024, 2, 29), date(2025, 2, 28), 12), date(2026, 2, 28))
+        self.assertEqual(next_billing_date_after(date(2024, 2, 29), date(2027, 2, 28), 12), date(2028, 2, 29))
+
+    def test_extended_billing_date_advances_exactly_one_cycle(self):
+        # /sub/<id>/extend는 next_billing_date에 30일을 더한다
+        extended = date(2024, 4, 1) + timedelta(days=30)
+        self.assertEqual(next_billing_date_after(date(2024, 1, 1), extended, 3), date(2024, 8, 1))
+
+        extended = date(2024, 2, 29) + timedelta(days=30)
+        self.assertEqual(next_billing_date_after(date(2024, 1, 31), extended, 1), date(2024, 4, 30))
+
+        extended = date(2024, 2, 15) + timedelta(days=30)
+        self.assertEqual(next_billing_date_after(date(2024, 1, 15), extended, 1), date(2024, 4, 16))
+
+
+class RenewDueSubscriptionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask('test')
+        self.app.config['RENEWAL_BATCH_SIZE'] = 100
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+
+        self.db = mock.Mock()
+        patcher = mock.patch.object(billing, 'db', self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def due_batches(self, *batches):
+        query = mock.Mock()
+        query.all.side_effect = list(batches) + [[]]
+        patcher = mock.patch.object(billing, 'due_subscriptions_query', return_value=query)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def executed(self):
+        updates, payments = [], []
+        for statement_call in self.db.session.execute.call_args_list:
+            statement, rows = statement_call.args
+            (updates if statement.is_dml and statement.table.name == 'user_subscriptions' else payments).extend(rows)
+        return updates, payments
+
+    def test_each_row_advances_one_cycle_with_one_payment(self):
+        rows = [
+            SimpleNamespace(id=1, start_date=date(2024, 1, 31), next_billing_date=date(2024, 2, 29),
+                            payment_method='card', monthly_fee=Decimal('9.99'), billing_cycle_months=1),
+            SimpleNamespace(id=2, start_date=date(2024, 1, 1), next_billing_date=date(2024, 5, 1),
+                            payment_method='paypal', monthly_fee=Decimal('5.00'), billing_cycle_months=3),
+        ]
+        self.due_batches(rows)
+
+        self.assertEqual(billing.renew_due_subscriptions(as_of=date(2024, 5, 1)), 2)
+
+        updates, payments = self.executed()
+        self.assertEqual(
+            {update['id']: update['next_billing_date'] for update in updates},
+            {1: date(2024, 3, 31), 2: date(2024, 8, 1)},
+        )
+        self.assertEqual(sorted(payment['user_subscription_id'] for payment in payments), [1, 2])
+        amounts = {payment['user_subscription_id']: payment['amount_paid'] for payment in payments}
+        self.assertEqual(amounts, {1: Decimal('9.99'), 2: Decimal('15.00')})
+        self.db.session.commit.assert_called_once()
+
+    def test_commits_per_batch_and_stops_at_max_batches(self):
+        row = SimpleNamespace(id=1, start_date=date(2024, 1, 1), next_billing_date=date(2024, 2, 1),
+                              payment_method='card', monthly_fee=Decimal('1.00'), billing_cycle_months=1)
+        self.due_batches([row], [row], [row])
+
+        self.assertEqual(billing.renew_due_subscriptions(as_of=date(2024, 6, 1), max_batches=2), 2)
+        self.assertEqual(self.db.session.commit.call_count, 2)
+        _, payments = self.executed()
+        self.assertEqual(len(payments), 2)
+
+    def test_rolls_back_and_raises_on_error(self):
+        self.due_batches([SimpleNamespace(id=1, start_date=date(2024, 1, 1), next_billing_date=date(2024, 2, 1),
+                                          payment_method='card', monthly_fee=Decimal('1.00'),
+                                          billing_cycle_months=1)])
+        self.db.session.execute.side_effect = RuntimeError('db down')
+
+        with self.assertRaises(RuntimeError):
+            billing.renew_due_subscriptions(as_of=date(2024, 2, 1))
+        self.db.session.rollback.assert_called_once()
+        self.db.session.commit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
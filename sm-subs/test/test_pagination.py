@@ -0,0 +1,143 @@
+"""
+결제 내역 커서 페이지네이션 단위 테스트 (Postgres 대신 메모리 SQLite로 GET /sub/payments를 실행).
+
+실행: cd sm-subs && python -m unittest discover -s test -p 'test_*.py'
+"""
+import base64
+import json
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from flask import Flask
+from flask_jwt_extended import create_access_token
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from app import db, jwt
+from app.models import SubscriptionPayment, SubscriptionPlan, SubscriptionProvider, UserSubscription
+from app.pagination import decode_cursor, encode_cursor
+from app.routes import bp
+
+
+@compiles(JSONB, 'sqlite')
+def compile_jsonb_for_sqlite(type_, compiler, **kw):
+    return 'JSON'
+
+
+def b64(raw):
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+class CursorCodecTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        payment_date = datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        cursor = encode_cursor(payment_date, 42)
+
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor), (payment_date, 42))
+
+    def test_invalid_cursors_raise_value_error(self):
+        cursors = [
+            'not base64!',
+            b64('not json'),
+            b64('[1]'),
+            b64('["2024-03-01T00:00:00", 1, 2]'),
+            b64('["yesterday", 1]'),
+            b64('["2024-03-01T00:00:00", "one"]'),
+            b64('null'),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class PaymentsCursorRouteTest(unittest.TestCase):
+    USER_ID = 1
+
+    def setUp(self):
+        self.app = Flask('test')
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            JWT_SECRET_KEY='test-secret-key-with-enough-length-32',
+            PAYMENTS_MAX_PER_PAGE=100,
+        )
+        db.init_app(self.app)
+        jwt.init_app(self.app)
+        self.app.register_blueprint(bp)
+
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+        db.create_all()
+        self.addCleanup(db.drop_all)
+        self.addCleanup(db.session.remove)
+
+        self.token = create_access_token(identity=str(self.USER_ID))
+        self.client = self.app.test_client()
+        self.expected_ids = self.seed()
+
+    def seed(self):
+        provider = SubscriptionProvider(provider_name='Provider')
+        plan = SubscriptionPlan(provider=provider, plan_name='Basic', monthly_fee=10)
+        mine = UserSubscription(user_id=self.USER_ID, subscription_plan=plan,
+                                start_date=date(2024, 1, 1), next_billing_date=date(2024, 2, 1))
+        other = UserSubscription(user_id=self.USER_ID + 1, subscription_plan=plan,
+                                 start_date=date(2024, 1, 1), next_billing_date=date(2024, 2, 1))
+        db.session.add_all([provider, plan, mine, other])
+        db.session.flush()
+
+        # 같은 결제 시각이 페이지 경계에 걸치도록 여러 건을 같은 시각으로 만든다
+        same_time = datetime(2024, 3, 1, 9, 0, 0)
+        payment_dates = [same_time] * 5 + [same_time + timedelta(days=1), same_time - timedelta(days=1)] * 2
+        payments = [
+            SubscriptionPayment(user_subscription_id=mine.id, amount_paid=10, payment_date=payment_date,
+                                payment_status='successful')
+            for payment_date in payment_dates
+        ]
+        payments.append(SubscriptionPayment(user_subscription_id=other.id, amount_paid=10,
+                                            payment_date=same_time, payment_status='successful'))
+        db.session.add_all(payments)
+        db.session.commit()
+
+        mine_payments = [payment for payment in payments if payment.user_subscription_id == mine.id]
+        mine_payments.sort(key=lambda payment: (payment.payment_date, payment.id), reverse=True)
+        return [payment.id for payment in mine_payments]
+
+    def get_payments(self, **params):
+        return self.client.get('/sub/payments', query_string=params,
+                               headers={'Authorization': f'Bearer {self.token}'})
+
+    def test_pages_follow_payment_date_then_id_without_gaps_or_duplicates(self):
+        seen = []
+        response = self.get_payments(pagination='cursor', per_page=2)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            self.assertLessEqual(len(body['items']), 2)
+            seen.extend(item['id'] for item in body['items'])
+            if not body['has_more']:
+                self.assertIsNone(body['next_cursor'])
+                break
+            response = self.get_payments(cursor=body['next_cursor'], per_page=2)
+
+        self.assertEqual(seen, self.expected_ids)
+
+    def test_include_total(self):
+        body = self.get_payments(pagination='cursor', per_page=3, include_total='true').get_json()
+        self.assertEqual(body['total'], len(self.expected_ids))
+        self.assertEqual([item['id'] for item in body['items']], self.expected_ids[:3])
+
+    def test_invalid_cursor_returns_400(self):
+        valid = self.get_payments(pagination='cursor', per_page=2).get_json()['next_cursor']
+        tampered = valid[:-2] + ('AA' if not valid.endswith('AA') else 'BB')
+
+        for cursor in ('%%%', b64('["2024-03-01T09:00:00"]'), tampered):
+            with self.subTest(cursor=cursor):
+                response = self.get_payments(cursor=cursor)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(), {'error': 'Invalid cursor.'})
+
+
+if __name__ == '__main__':
+    unittest.main()
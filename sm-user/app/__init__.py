@@ -1,11 +1,15 @@
-import logging
 import os
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from redis import Redis
 
 from .config import Config
+from .hashing import PasswordHasher
+from .health import ReadinessChecker
+from .logs import init_logging
+from .metrics import init_metrics, reset_pool_totals
 
 db = SQLAlchemy()
 jwt = JWTManager()
@@ -14,30 +18,63 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    # Logger 설정: 큐에 넣기만 하고 JSON 포맷팅/쓰기는 리스너 스레드에서 처리, 요청 ID 전파
+    init_logging(app)
+
     # 환경 변수에서 CORS 허용 도메인 설정
     allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173').split(',')
 
     # CORS 적용
     CORS(app, resources={r"/*": {"origins": allowed_origins}}, supports_credentials=True)
 
+    app.redis = Redis(
+        host=app.config['REDIS_HOST'],
+        port=app.config['REDIS_PORT'],
+        db=app.config['REDIS_DB'],
+        password=app.config['REDIS_PASSWORD'],
+        decode_responses=True
+    )
+
+    # 비밀번호 해시를 요청 스레드 대신 크기가 제한된 프로세스 풀에서 실행
+    app.password_hasher = PasswordHasher.from_config(app.config)
+
     db.init_app(app)
+    # 요청 지연 시간, 요청당 SQL 실행, 연결 풀 지표 (/metrics)
+    init_metrics(app, db)
     jwt.init_app(app)
 
-    # Logger 설정
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    app.logger.addHandler(handler)
+    # 사용자 변경 시 프로필 캐시 무효화
+    from app.profile_cache import register_user_cache_events
+    register_user_cache_events()
 
-    # 로깅 레벨 설정
-    app.logger.setLevel(logging.INFO)
-    app.logger.info("Flask application started")
+    # 사용자 활성 상태 변경 시 비활성 사용자 집합 갱신 (다른 서비스의 토큰 폐기)
+    from app.user_status import register_user_status_events
+    register_user_status_events()
+
+    # 운영용 CLI 명령 (flask sync-deactivated-users)
+    from app.commands import register_commands
+    register_commands(app)
+
+    # /health/ready 의존성 점검 (제한 시간 + 짧은 결과 캐시)
+    app.readiness = ReadinessChecker.from_app(app, db)
 
     from app.routes import bp as api_bp
     CORS(api_bp)
     app.register_blueprint(api_bp)
 
+    app.logger.info("Flask application started")
     return app
+
+
+def reinit_after_fork(app):
+    """
+    마스터에서 만든 앱을 fork한 워커에서 호출한다. 부모와 공유하는 DB/Redis 연결을 버리고 해시 프로세스 풀과 준비 상태 점검 스레드 풀은 워커에서 새로 만든다.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    reset_pool_totals()
+    app.log_pipeline.reinit_after_fork()
+    app.redis.connection_pool.reset()
+    app.password_hasher = PasswordHasher.from_config(app.config)
+    app.readiness = ReadinessChecker.from_app(app, db)
@@ -0,0 +1,24 @@
+import hmac
+from functools import wraps
+from http import HTTPStatus
+
+from flask import current_app, jsonify, request
+
+INTERNAL_TOKEN_HEADER = 'X-Internal-Token'
+
+
+def internal_api_required(fn):
+    """
+    내부 서비스 호출 전용 엔드포인트에 사용하는 데코레이터.
+    X-Internal-Token 헤더가 INTERNAL_API_TOKEN 설정값과 일치해야 한다.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config['INTERNAL_API_TOKEN']
+        provided = request.headers.get(INTERNAL_TOKEN_HEADER, '')
+        if not expected or not hmac.compare_digest(provided, expected):
+            current_app.logger.warning('Rejected internal API call to %s', request.path)
+            return jsonify({'error': 'Access denied.'}), HTTPStatus.FORBIDDEN
+        return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,13 @@
+import click
+
+from app.user_status import sync_deactivated_users
+
+
+def register_commands(app):
+    @app.cli.command('sync-deactivated-users')
+    def sync_deactivated_users_command():
+        """
+        DB의 비활성 사용자로 Redis 비활성 사용자 집합을 다시 만든다.
+        """
+        count = sync_deactivated_users()
+        click.echo(f'Synced {count} deactivated users.')
@@ -1,6 +1,8 @@
 import os
 from datetime import timedelta
 
+from .db_pool import TimedQueuePool
+
 
 class Config:
     # Construct database URI from individual components
@@ -13,6 +15,65 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # DB 연결 풀과 서버 측 타임아웃 (모든 바인드에 적용)
+    # 워커 프로세스당 최대 연결 수는 DB_POOL_SIZE + DB_MAX_OVERFLOW (바인드마다)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT_SECOND = int(os.getenv('DB_POOL_TIMEOUT_SECOND', '30'))
+    DB_POOL_RECYCLE_SECOND = int(os.getenv('DB_POOL_RECYCLE_SECOND', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', '60000'))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': TimedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT_SECOND,
+        'pool_recycle': DB_POOL_RECYCLE_SECOND,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        'connect_args': {
+            'options': (
+                f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} '
+                f'-c idle_in_transaction_session_timeout={DB_IDLE_IN_TRANSACTION_TIMEOUT_MS}'
+            ),
+        },
+    }
+
+    REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+    REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+    REDIS_DB = int(os.getenv('REDIS_DB', 0))
+    REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', 'redispassword')
+
+    # GET /users/me 프로필 캐시 (User.get_cache_key). 없는 사용자도 짧게 캐시한다
+    USER_CACHE_TTL_SECOND = int(os.getenv('USER_CACHE_TTL_SECOND', '300'))
+    USER_NEGATIVE_CACHE_TTL_SECOND = int(os.getenv('USER_NEGATIVE_CACHE_TTL_SECOND', '30'))
+
+    # 비활성 사용자 ID 집합과 상태 변경 채널 (sm-subs, sm-reco가 JWT 검사에 사용)
+    DEACTIVATED_USERS_KEY = os.getenv('DEACTIVATED_USERS_KEY', 'users:deactivated')
+    USER_STATUS_CHANNEL = os.getenv('USER_STATUS_CHANNEL', 'user.status')
+
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'mJMLk2qwEFKp1Lx2FatzwVOA6-3FjMqkLEAWu74uCU9')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600)))  # 기본값: 1시간
+
+    # 내부 서비스 간 호출 인증 토큰 (비어 있으면 내부 API 비활성화)
+    INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+
+    # 비밀번호 해시 (Werkzeug generate_password_hash의 method, 예: 'scrypt', 'scrypt:65536:8:1', 'pbkdf2:sha256:1000000')
+    # 방식이나 비용을 바꾸면 기존 사용자의 해시는 다음 로그인 때 새 설정으로 다시 만든다
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    # 해시 계산용 프로세스 수 (Gunicorn 워커마다)
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+    # 실행 중 + 대기 중인 해시 작업 상한. 넘으면 즉시 503으로 거절
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '16'))
+    PASSWORD_HASH_TIMEOUT_SECOND = float(os.getenv('PASSWORD_HASH_TIMEOUT_SECOND', '5'))
+
+    # 로깅: 큐 기반 JSON 로그. 큐가 가득 차면 로그를 버린다
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # 호출이 많은 엔드포인트 로거의 INFO 로그 샘플링 비율 ('로거=비율,...'), WARNING 이상은 모두 남긴다
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+    # /health/ready 의존성 점검 제한 시간과 결과 재사용 시간
+    READINESS_TIMEOUT_SECOND = float(os.getenv('READINESS_TIMEOUT_SECOND', '1'))
+    READINESS_CACHE_SECOND = float(os.getenv('READINESS_CACHE_SECOND', '2'))
@@ -0,0 +1,65 @@
+"""
+DB 연결 풀 체크아웃 지표.
+
+SQLALCHEMY_ENGINE_OPTIONS의 poolclass로 TimedQueuePool을 지정하면 엔진(바인드)마다
+체크아웃 횟수, 풀에서 연결을 얻기까지 기다린 시간, 풀 타임아웃 횟수를 기록한다.
+워커 수를 늘렸을 때 풀 대기나 Postgres 연결 고갈이 시작되는 지점을 확인하는 데 사용한다.
+"""
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """
+    체크아웃 대기 시간과 타임아웃을 기록하는 QueuePool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return connection
+
+    def stats(self):
+        with self._metrics_lock:
+            return {
+                'pool_size': self.size(),
+                'checked_out': self.checkedout(),
+                'checked_in': self.checkedin(),
+                'overflow': self.overflow(),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+            }
+
+
+def pool_stats(engines):
+    """
+    바인드 이름(기본 엔진은 'primary')별 풀 상태와 체크아웃 지표.
+    """
+    stats = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        stats[key or 'primary'] = pool.stats() if isinstance(pool, TimedQueuePool) else {'status': pool.status()}
+    return stats
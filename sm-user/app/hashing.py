@@ -0,0 +1,92 @@
+"""
+비밀번호 해시 전용 프로세스 풀.
+
+Werkzeug의 비밀번호 해시(scrypt/pbkdf2)는 일부러 느리게 만든 CPU 작업이라 요청 스레드에서 실행하면
+로그인 급증 시 모든 워커가 해시 계산에 묶이고 GIL 때문에 다른 요청도 함께 느려진다.
+해시 계산은 크기가 제한된 프로세스 풀에서 실행하고, 대기 중인 작업이 max_pending에 도달하면
+새 작업은 기다리지 않고 즉시 PasswordHasherBusy로 거절한다 (라우트에서 503으로 응답).
+
+풀의 프로세스는 forkserver로 만든다. 기본값(fork)이면 첫 작업을 받은 요청 스레드에서 fork하므로
+로그 리스너, Redis 리스너나 다른 요청 스레드가 잡고 있던 잠금이 잡힌 채로 복사되어 자식이 멈출 수 있다.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def _noop():
+    return None
+
+
+class PasswordHasherBusy(Exception):
+    """
+    해시 작업 대기열이 가득 차 작업을 받지 않았을 때 발생한다.
+    """
+
+
+def hash_method(password_hash):
+    """
+    저장된 해시의 방식과 비용 (예: 'scrypt:32768:8:1', 'pbkdf2:sha256:1000000').
+    """
+    return password_hash.split('$', 1)[0] if password_hash else None
+
+
+class PasswordHasher:
+
+    def __init__(self, method, workers, max_pending, timeout):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver'))
+        # 설정값('scrypt'처럼 비용 생략 가능)을 실제 해시에 기록되는 형식으로 맞춰 둔다
+        self.current_method = hash_method(generate_password_hash('', method))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            method=config['PASSWORD_HASH_METHOD'],
+            workers=config['PASSWORD_HASH_WORKERS'],
+            max_pending=config['PASSWORD_HASH_MAX_PENDING'],
+            timeout=config['PASSWORD_HASH_TIMEOUT_SECOND'],
+        )
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Password hashing queue is full')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # 작업은 풀에서 계속 실행되고, 끝나면 슬롯을 반납한다
+            raise PasswordHasherBusy(f'Password hashing did not finish within {self.timeout}s')
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        저장된 해시가 현재 설정과 다른 방식이나 비용으로 만들어졌으면 True.
+        """
+        return hash_method(password_hash) != self.current_method
+
+    def warm_up(self):
+        """
+        풀의 프로세스를 미리 띄워 둔다. 첫 로그인 요청이 프로세스 생성 시간을 기다리지 않도록 워커가 뜬 직후 호출한다.
+        """
+        futures = [self._executor.submit(_noop) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import current_app
 
 from app import db
 
@@ -11,17 +11,22 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    # scrypt 해시는 128자를 넘는다 (users.sql과 같은 길이)
+    password_hash = db.Column(db.String(256))
     full_name = db.Column(db.String(120))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
 
+    # 해시 계산은 app.password_hasher의 프로세스 풀에서 실행된다 (대기열이 가득 차면 PasswordHasherBusy)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = current_app.password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return current_app.password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return current_app.password_hasher.needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
@@ -0,0 +1,129 @@
+"""
+사용자 프로필 read-through 캐시.
+
+GET /users/me 응답(User.to_dict)을 User.get_cache_key(user_id) 키로 Redis에 보관한다.
+없는 사용자는 짧은 TTL의 음성 캐시로 저장해 삭제된 계정의 토큰으로 반복 호출해도 DB에 가지 않는다.
+User 행이 생성/수정/삭제되어 커밋되면 세션 이벤트에서 사용자별 버전 값을 올리고 해당 키를 지운다.
+
+조회는 DB를 읽기 전에 버전 값을 읽어 두고, 저장 시점에도 같을 때만 캐시에 쓴다.
+그래서 DB를 읽은 뒤 다른 요청이 커밋한 변경(비활성화, 삭제 포함)이 이전 값으로 덮이지 않는다.
+"""
+import json
+
+from flask import current_app
+from redis.exceptions import RedisError, WatchError
+from sqlalchemy import event
+
+from app import db
+from app.metrics import record_cache
+from app.models import User
+
+# 음성 캐시 표시 (없는 사용자)
+MISSING = 'null'
+# 버전 값은 진행 중인 조회보다 오래 남아 있으면 충분하다
+VERSION_TTL_SECOND = 86400
+
+
+def profile_version_key(user_id):
+    return f'{User.get_cache_key(user_id)}:version'
+
+
+def store_profile(redis, user_id, version, value, ttl):
+    """
+    버전 값이 version(조회 전에 읽은 값)과 같을 때만 프로필을 저장한다. 저장했으면 True.
+    """
+    version_key = profile_version_key(user_id)
+    with redis.pipeline() as pipe:
+        try:
+            pipe.watch(version_key)
+            if pipe.get(version_key) != version:
+                return False
+            pipe.multi()
+            pipe.setex(User.get_cache_key(user_id), ttl, value)
+            pipe.execute()
+        except WatchError:
+            # 저장 도중 사용자가 변경되었으면 이번 결과는 캐시하지 않는다
+            return False
+    return True
+
+
+def get_user_profile(user_id):
+    """
+    사용자 프로필 dict를 반환한다. 사용자가 없으면 None.
+    Redis에 접근할 수 없으면 DB에서 바로 조회한다.
+    """
+    key = User.get_cache_key(user_id)
+    try:
+        cached, version = current_app.redis.mget(key, profile_version_key(user_id))
+    except RedisError as e:
+        current_app.logger.warning('User cache lookup failed: %s', e)
+        record_cache('user_profile', 'error')
+        cached = None
+        key = None
+    else:
+        record_cache('user_profile', cached is not None)
+
+    if cached is not None:
+        return None if cached == MISSING else json.loads(cached)
+
+    user = db.session.get(User, user_id)
+    profile = user.to_dict() if user else None
+
+    if key is not None:
+        try:
+            if profile is None:
+                store_profile(current_app.redis, user_id, version,
+                              MISSING, current_app.config['USER_NEGATIVE_CACHE_TTL_SECOND'])
+            else:
+                store_profile(current_app.redis, user_id, version,
+                              json.dumps(profile), current_app.config['USER_CACHE_TTL_SECOND'])
+        except RedisError as e:
+            current_app.logger.warning('User cache store failed: %s', e)
+    return profile
+
+
+def invalidate_user_profiles(user_ids):
+    keys = [User.get_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    try:
+        pipe = current_app.redis.pipeline(transaction=True)
+        for user_id in user_ids:
+            pipe.incr(profile_version_key(user_id))
+            pipe.expire(profile_version_key(user_id), VERSION_TTL_SECOND)
+        pipe.delete(*keys)
+        pipe.execute()
+    except RedisError as e:
+        current_app.logger.error('Failed to invalidate user cache for %s: %s', keys, e)
+
+
+def _track_user_changes(session, flush_context):
+    # after_flush에서는 새 사용자에게도 id가 부여되어 있다 (이전 음성 캐시 제거 대상)
+    changed_user_ids = session.info.setdefault('changed_user_ids', set())
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, User) and obj.id is not None:
+            changed_user_ids.add(obj.id)
+
+
+def _invalidate_after_commit(session):
+    changed_user_ids = session.info.pop('changed_user_ids', None)
+    if changed_user_ids:
+        invalidate_user_profiles(changed_user_ids)
+
+
+def _reset_after_rollback(session):
+    session.info.pop('changed_user_ids', None)
+
+
+def register_user_cache_events():
+    """
+    User 변경이 커밋되면 프로필 캐시를 지우는 세션 이벤트를 등록한다.
+    """
+    listeners = (
+        ('after_flush', _track_user_changes),
+        ('after_commit', _invalidate_after_commit),
+        ('after_rollback', _reset_after_rollback),
+    )
+    for name, fn in listeners:
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
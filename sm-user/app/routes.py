@@ -3,11 +3,21 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 from http import HTTPStatus
 
 from app import db, jwt
+from app.auth import internal_api_required
+from app.db_pool import pool_stats
+from app.hashing import PasswordHasherBusy
 from app.models import User
+from app.profile_cache import get_user_profile
 
 bp = Blueprint('api', __name__)
 
 
+def hashing_busy_response():
+    response = jsonify({'error': 'Server is busy. Please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, HTTPStatus.SERVICE_UNAVAILABLE
+
+
 @bp.route('/users/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -23,7 +33,11 @@ def register():
         username=data['username'],
         full_name=data.get('full_name', '')
     )
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except PasswordHasherBusy as e:
+        current_app.logger.warning('Rejected registration: %s', e)
+        return hashing_busy_response()
 
     db.session.add(user)
     db.session.commit()
@@ -42,6 +56,18 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid credentials.'}), 401
 
+        if user.is_active is False:
+            return jsonify({'error': 'Account is deactivated.'}), 403
+
+        # 이전 방식/비용으로 저장된 해시는 평문을 알고 있는 지금 새 설정으로 다시 만든다
+        if user.password_needs_rehash():
+            try:
+                user.set_password(data['password'])
+                db.session.commit()
+            except PasswordHasherBusy as e:
+                # 로그인 자체는 성공 처리하고 다음 로그인 때 다시 시도
+                current_app.logger.info('Skipped password rehash for user %s: %s', user.id, e)
+
         additional_claims = {
             'email': user.email,
         }
@@ -57,6 +83,9 @@ def login():
             'token_type': 'bearer'
         }), 200
 
+    except PasswordHasherBusy as e:
+        current_app.logger.warning('Rejected login: %s', e)
+        return hashing_busy_response()
     except Exception as e:
         # Log the error here
         return jsonify({'error': 'A server error occurred.'}), 500
@@ -66,14 +95,19 @@ def login():
 @jwt_required()
 def get_current_user():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-
-        if not user:
+        try:
+            user_id = int(get_jwt_identity())
+        except (TypeError, ValueError):
+            # 사용자 ID가 아닌 주체의 토큰
+            current_app.logger.warning('Rejected /users/me with non-user identity %r', get_jwt_identity())
+            return jsonify({'error': 'Invalid token.'}), 401
+        profile = get_user_profile(user_id)
+
+        if profile is None:
             return jsonify({'error': 'User not found.'}), 404
 
         # Add proper error handling for JWT-specific exceptions
-        return jsonify(user.to_dict()), 200
+        return jsonify(profile), 200
 
     except jwt.ExpiredSignatureError:
         return jsonify({'error': 'Token has expired.'}), 401
@@ -91,4 +125,30 @@ def health_check():
     return jsonify({
         'status': 'ok',
         'message': 'Server is healthy.'
-    }), HTTPStatus.OK
\ No newline at end of file
+    }), HTTPStatus.OK
+
+
+@bp.route('/health/live', methods=['GET'])
+def liveness_check():
+    """
+    프로세스가 요청을 처리할 수 있는지만 확인하는 엔드포인트 (의존성은 확인하지 않는다)
+    """
+    return jsonify({'status': 'ok'}), HTTPStatus.OK
+
+
+@bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    의존성을 제한 시간 안에 점검하는 엔드포인트. 하나라도 실패하거나 느리면 503을 반환한다.
+    """
+    ready, report = current_app.readiness.status()
+    return jsonify(report), HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE
+
+
+@bp.route('/health/db-pool', methods=['GET'])
+@internal_api_required
+def db_pool_stats():
+    """
+    DB 연결 풀 상태와 체크아웃 지표 (바인드별)
+    """
+    return jsonify(pool_stats(db.engines)), HTTPStatus.OK
@@ -0,0 +1,110 @@
+"""
+비활성 사용자 목록 발행.
+
+User.is_active가 바뀌거나 사용자가 삭제되어 커밋되면 Redis 집합(DEACTIVATED_USERS_KEY)을 갱신하고
+USER_STATUS_CHANNEL로 변경분을 발행한다. sm-subs와 sm-reco는 이 집합을 프로세스 메모리에 들고
+JWT 검사 훅에서 비활성 사용자의 토큰을 거절하므로, 요청마다 sm-user를 호출하지 않고도 토큰을 폐기할 수 있다.
+"""
+import json
+
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+
+from app import db
+from app.models import User
+
+
+def publish_user_status(deactivated_ids=(), activated_ids=()):
+    """
+    비활성/재활성 사용자 ID를 Redis 집합에 반영하고 변경분을 발행한다.
+    """
+    deactivated_ids = sorted({int(user_id) for user_id in deactivated_ids})
+    activated_ids = sorted({int(user_id) for user_id in activated_ids})
+    if not deactivated_ids and not activated_ids:
+        return
+    key = current_app.config['DEACTIVATED_USERS_KEY']
+    payload = json.dumps({'deactivated': deactivated_ids, 'activated': activated_ids})
+    try:
+        pipe = current_app.redis.pipeline()
+        if deactivated_ids:
+            pipe.sadd(key, *deactivated_ids)
+        if activated_ids:
+            pipe.srem(key, *activated_ids)
+        pipe.publish(current_app.config['USER_STATUS_CHANNEL'], payload)
+        pipe.execute()
+    except RedisError as e:
+        current_app.logger.error('Failed to publish user status %s: %s', payload, e)
+
+
+def sync_deactivated_users():
+    """
+    DB 기준으로 Redis 집합을 다시 만들고 집합에 든 사용자 수를 반환한다 (초기 적재, 유실 복구용).
+    삭제된 사용자는 DB에 남지 않으므로 기존 집합에 있던 ID 중 users 테이블에 없는 것은 그대로 유지한다.
+    Redis가 비워진 뒤에 삭제된 사용자의 ID는 되살릴 수 없으므로, 그 사용자의 토큰은 만료될 때까지 유효하다.
+    """
+    key = current_app.config['DEACTIVATED_USERS_KEY']
+    user_ids = {user_id for (user_id,) in db.session.query(User.id).filter(User.is_active.is_(False))}
+    existing_ids = sorted(int(user_id) for user_id in current_app.redis.smembers(key))
+    for start in range(0, len(existing_ids), 10000):
+        chunk = existing_ids[start:start + 10000]
+        present_ids = {user_id for (user_id,) in db.session.query(User.id).filter(User.id.in_(chunk))}
+        user_ids.update(user_id for user_id in chunk if user_id not in present_ids)
+    user_ids = sorted(user_ids)
+    staging_key = f'{key}:sync'
+    pipe = current_app.redis.pipeline()
+    pipe.delete(staging_key)
+    for start in range(0, len(user_ids), 10000):
+        pipe.sadd(staging_key, *user_ids[start:start + 10000])
+    if user_ids:
+        pipe.rename(staging_key, key)
+    else:
+        pipe.delete(key)
+    pipe.execute()
+    return len(user_ids)
+
+
+def _track_status_changes(session, flush_context):
+    deactivated = session.info.setdefault('deactivated_user_ids', set())
+    activated = session.info.setdefault('activated_user_ids', set())
+
+    def mark(user_id, is_active):
+        # 한 트랜잭션 안에서 여러 번 바뀌면 마지막 상태만 남긴다
+        (activated if is_active else deactivated).add(user_id)
+        (deactivated if is_active else activated).discard(user_id)
+
+    # 새로 만든 활성 사용자는 집합에 없으므로 발행할 필요가 없다
+    for obj in session.new:
+        if isinstance(obj, User) and obj.is_active is False:
+            mark(obj.id, False)
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.is_active.history.has_changes():
+            mark(obj.id, obj.is_active is not False)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            mark(obj.id, False)
+
+
+def _publish_after_commit(session):
+    deactivated = session.info.pop('deactivated_user_ids', None) or set()
+    activated = session.info.pop('activated_user_ids', None) or set()
+    publish_user_status(deactivated, activated)
+
+
+def _reset_after_rollback(session):
+    session.info.pop('deactivated_user_ids', None)
+    session.info.pop('activated_user_ids', None)
+
+
+def register_user_status_events():
+    """
+    사용자 상태 변경이 커밋되면 비활성 사용자 집합을 갱신하는 세션 이벤트를 등록한다.
+    """
+    listeners = (
+        ('after_flush', _track_status_changes),
+        ('after_commit', _publish_after_commit),
+        ('after_rollback', _reset_after_rollback),
+    )
+    for name, fn in listeners:
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)